@@ -1,7 +1,23 @@
-from .base import BaseAgent
-from .manager import AgentManager, AgentRegistry
-from .react import ReActAgent, ReActAgentPlugin
-from .structured import StructuredAgent, StructuredAgentPlugin
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .base import BaseAgent
+    from .manager import AgentManager, AgentRegistry
+    from .react import ReActAgent, ReActAgentPlugin
+    from .structured import StructuredAgent, StructuredAgentPlugin
+
+# Public names are imported on first access (PEP 562), so importing a light
+# submodule doesn't pull in every dependency of the package.
+_LAZY_IMPORTS = {
+    "BaseAgent": ".base",
+    "AgentManager": ".manager",
+    "AgentRegistry": ".manager",
+    "ReActAgent": ".react",
+    "ReActAgentPlugin": ".react",
+    "StructuredAgent": ".structured",
+    "StructuredAgentPlugin": ".structured",
+}
 
 __all__ = [
     "AgentManager",
@@ -12,3 +28,12 @@ __all__ = [
     "StructuredAgent",
     "StructuredAgentPlugin",
 ]
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -1,12 +1,17 @@
+from __future__ import annotations
+
 import asyncio
 import json
 import logging
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
-
-from openai.types.chat import ChatCompletionMessageParam
-
-from mikoshi.agents.context import format_history, generate_title, parse_mentions
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+
+from mikoshi.agents.context import (
+    format_history_since,
+    generate_title,
+    needs_title,
+    parse_mentions,
+)
 from mikoshi.agents.context.messages import extract_assistant_content
 from mikoshi.agents.context.skills import apply_skill_context, build_skill_context
 from mikoshi.agents.streaming import STREAM_DONE, StreamEvent
@@ -16,12 +21,34 @@ from mikoshi.providers.provider import Provider
 from mikoshi.skills.registry import SkillRegistry
 from mikoshi.tools.approval import ToolDeniedError
 from mikoshi.tools.context import ToolCallContext, WorkspaceContext
+from mikoshi.tools.handler_base import tool_to_dict
 from mikoshi.tools.manager import ToolManager
 from mikoshi.tools.workspace import WORKSPACE_SERVER_NAME
 from mikoshi.workspace import WorkspaceService
 
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletionMessageParam
+
 logger = logging.getLogger(__name__)
 
+# Strong references to fire-and-forget tasks; the event loop only keeps weak ones
+_background_tasks: Set[asyncio.Task] = set()
+
+# How long shutdown waits for background tasks (chat titles) before cancelling them
+BACKGROUND_DRAIN_TIMEOUT = 10.0
+
+
+async def drain_background_tasks(timeout: float = BACKGROUND_DRAIN_TIMEOUT) -> None:
+    """Wait for fire-and-forget tasks to finish, cancelling any still running."""
+    if not _background_tasks:
+        return
+    _, pending = await asyncio.wait(set(_background_tasks), timeout=timeout)
+    if pending:
+        logger.warning("Cancelling %d unfinished background task(s)", len(pending))
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
 
 class BaseAgent(ABC):
     """Abstract base for all agent types. Provides orchestration via Template Method pattern."""
@@ -68,6 +95,16 @@ class BaseAgent(ABC):
             title_provider.get_llm_client() if title_provider else None
         )
         self._title_model_id = title_model_id
+        # Set once the chat is known to have a title, so later turns skip naming
+        self._title_set = False
+        self._title_task: Optional[asyncio.Task] = None
+        # Agent loops currently running for this chat
+        self._active_turns = 0
+        # Converted history up to sequence _history_upto; each turn only
+        # converts the messages stored since
+        self._history: List[ChatCompletionMessageParam] = []
+        self._history_upto: Optional[int] = None
+        self._history_lock = asyncio.Lock()
 
     @abstractmethod
     async def _get_iteration_context(
@@ -86,53 +123,70 @@ class BaseAgent(ABC):
         """Handle the final LLM response when no tool calls remain. Subclasses define output strategy."""
         ...
 
+    @property
+    def busy(self) -> bool:
+        """Whether a turn or the chat's title generation is still running."""
+        return self._active_turns > 0 or self._title_task is not None
+
     async def _loop(
         self, message: str, queue: Optional[asyncio.Queue] = None
+    ) -> Dict[str, Any]:
+        self._active_turns += 1
+        try:
+            return await self._run_loop(message, queue)
+        finally:
+            self._active_turns -= 1
+
+    async def _run_loop(
+        self, message: str, queue: Optional[asyncio.Queue]
     ) -> Dict[str, Any]:
         messages = await self._get_iteration_context(message)
         tools = await self._get_tools(self.tool_servers)
 
         try:
             for iteration in range(self.max_iterations):
-                logger.debug(
-                    "Iteration %d — Sending %d messages to LLM (model=%s)",
-                    iteration + 1,
-                    len(messages),
-                    self.model_id,
-                )
-                for i, m in enumerate(messages):
-                    role = m.get("role", "?")
-                    content = m.get("content")
-                    if isinstance(content, str) and len(content) > 500:
-                        content = content[:500] + "... [truncated]"
+                # Debug dumps walk the whole context; skip them unless enabled
+                debug = logger.isEnabledFor(logging.DEBUG)
+                if debug:
                     logger.debug(
-                        "  messages[%d] role=%s content=%s",
-                        i,
-                        role,
-                        content,
+                        "Iteration %d — Sending %d messages to LLM (model=%s)",
+                        iteration + 1,
+                        len(messages),
+                        self.model_id,
                     )
+                    for i, m in enumerate(messages):
+                        role = m.get("role", "?")
+                        content = m.get("content")
+                        if isinstance(content, str) and len(content) > 500:
+                            content = content[:500] + "... [truncated]"
+                        logger.debug(
+                            "  messages[%d] role=%s content=%s",
+                            i,
+                            role,
+                            content,
+                        )
 
-                if tools:
-                    tool_names = [t["function"]["name"] for t in tools]
-                    logger.debug("Available tools: %s", tool_names)
+                    if tools:
+                        tool_names = [t["function"]["name"] for t in tools]
+                        logger.debug("Available tools: %s", tool_names)
 
                 response = await self._llm(messages, tools if tools else None)
-                logger.debug(
-                    "LLM raw response: %s",
-                    json.dumps(response, default=str, ensure_ascii=False)[:2000],
-                )
-
                 message_data = response["choices"][0]["message"]
-                logger.debug(
-                    "LLM message — finish_reason=%s, has_tool_calls=%s, content=%s",
-                    response["choices"][0].get("finish_reason"),
-                    bool(message_data.get("tool_calls")),
-                    (
-                        message_data.get("content", "")[:500]
-                        if message_data.get("content")
-                        else None
-                    ),
-                )
+                if debug:
+                    logger.debug(
+                        "LLM raw response: %s",
+                        json.dumps(response, default=str, ensure_ascii=False)[:2000],
+                    )
+                    logger.debug(
+                        "LLM message — finish_reason=%s, has_tool_calls=%s, content=%s",
+                        response["choices"][0].get("finish_reason"),
+                        bool(message_data.get("tool_calls")),
+                        (
+                            message_data.get("content", "")[:500]
+                            if message_data.get("content")
+                            else None
+                        ),
+                    )
 
                 if (
                     not message_data.get("tool_calls")
@@ -142,9 +196,15 @@ class BaseAgent(ABC):
                         response, message_data, queue
                     )
 
-                msg = await self._save_message("assistant", response)
+                # Tool arguments are parsed once here and reused for persistence,
+                # the UI event and the tool calls themselves
+                content, reasoning, tool_calls = extract_assistant_content(response)
+                msg = self._save_assistant_message(content, reasoning, tool_calls)
                 await self._emit(
-                    queue, StreamEvent(type="message", data=self._format_message(msg))
+                    queue,
+                    StreamEvent(
+                        type="message", data=self._format_message(msg, tool_calls)
+                    ),
                 )
 
                 tool_calls_raw = message_data["tool_calls"]
@@ -156,20 +216,18 @@ class BaseAgent(ABC):
                     }
                 )
 
-                for tool_call in tool_calls_raw:
-                    tool_name = tool_call["function"]["name"]
-                    tool_args_str = tool_call["function"]["arguments"]
+                for tool_call, parsed_call in zip(tool_calls_raw, tool_calls):
+                    tool_name = parsed_call["name"]
+                    tool_args = parsed_call["arguments"]
 
-                    if isinstance(tool_args_str, str):
-                        tool_args = json.loads(tool_args_str)
-                    else:
-                        tool_args = tool_args_str
-
-                    logger.debug(
-                        "Calling tool: %s args=%s",
-                        tool_name,
-                        json.dumps(tool_args, default=str, ensure_ascii=False)[:1000],
-                    )
+                    if debug:
+                        logger.debug(
+                            "Calling tool: %s args=%s",
+                            tool_name,
+                            json.dumps(tool_args, default=str, ensure_ascii=False)[
+                                :1000
+                            ],
+                        )
 
                     try:
                         workspace_ctx = None
@@ -207,7 +265,7 @@ class BaseAgent(ABC):
                     )
 
                     msg = await self._save_message(
-                        "tool", str(result), tool_call_id=tool_call["id"]
+                        "tool", result_str, tool_call_id=tool_call["id"]
                     )
                     await self._emit(
                         queue,
@@ -243,7 +301,7 @@ class BaseAgent(ABC):
                         {
                             "role": "tool",
                             "tool_call_id": tool_call["id"],
-                            "content": str(result),
+                            "content": result_str,
                         }
                     )
 
@@ -275,37 +333,48 @@ class BaseAgent(ABC):
         await self._loop(message, queue=queue)
         await self._generate_title()
 
-    def _prepare_retry(self) -> Optional[str]:
-        history = self.db.get_chat_history(self.chat_id)
-        last_assistant = None
+    @staticmethod
+    def _last_turn(
+        history: List[Message],
+    ) -> Tuple[Optional[Message], Optional[Message]]:
+        """Return the latest user and assistant messages in history."""
         last_user = None
+        last_assistant = None
         for msg in reversed(history):
-            if msg.role == "assistant" and last_assistant is None:
-                last_assistant = msg
-            elif msg.role == "user" and last_user is None:
+            if msg.role == "user" and last_user is None:
                 last_user = msg
-            if last_assistant and last_user:
+            elif msg.role == "assistant" and last_assistant is None:
+                last_assistant = msg
+            if last_user and last_assistant:
                 break
+        return last_user, last_assistant
 
-        if not last_user:
-            return None
+    async def _prepare_retry(self) -> Optional[str]:
+        # Held so a conversion already in flight can't extend the reset history
+        async with self._history_lock:
+            history = self.db.get_chat_history(self.chat_id)
+            last_user, last_assistant = self._last_turn(history)
 
-        if last_assistant:
-            for msg in history:
-                if msg.role == "tool" and msg.sequence > last_assistant.sequence:
-                    self.db.delete_message(msg.id)
-            self.db.delete_message(last_assistant.id)
+            if not last_user:
+                return None
 
-        return last_user.content
+            if last_assistant:
+                self._invalidate_history()
+                for msg in history:
+                    if msg.role == "tool" and msg.sequence > last_assistant.sequence:
+                        self.db.delete_message(msg.id)
+                self.db.delete_message(last_assistant.id)
+
+            return last_user.content
 
     async def retry(self) -> Dict[str, Any]:
-        message = self._prepare_retry()
+        message = await self._prepare_retry()
         if not message:
             return {"error": "No user message to retry"}
         return await self._loop(message)
 
     async def retry_stream(self, queue: asyncio.Queue) -> None:
-        message = self._prepare_retry()
+        message = await self._prepare_retry()
         if not message:
             await queue.put(
                 StreamEvent(type="error", data={"message": "No user message to retry"})
@@ -314,68 +383,64 @@ class BaseAgent(ABC):
             return
         await self._loop(message, queue=queue)
 
-    def _prepare_edit(self) -> Optional[Message]:
-        history = self.db.get_chat_history(self.chat_id)
-        last_user = None
-        last_assistant = None
-        for msg in reversed(history):
-            if msg.role == "user" and last_user is None:
-                last_user = msg
-            elif msg.role == "assistant" and last_assistant is None:
-                last_assistant = msg
-            if last_user and last_assistant:
-                break
+    async def _prepare_edit(self) -> Optional[Message]:
+        # Held so a conversion already in flight can't extend the reset history
+        async with self._history_lock:
+            history = self.db.get_chat_history(self.chat_id)
+            last_user, last_assistant = self._last_turn(history)
 
-        if not last_user:
-            return None
+            if not last_user:
+                return None
 
-        if last_assistant:
-            for msg in history:
-                if msg.sequence > last_user.sequence:
-                    self.db.delete_message(msg.id)
+            # The last user message is replaced even without a reply to remove
+            self._invalidate_history()
+            if last_assistant:
+                for msg in history:
+                    if msg.sequence > last_user.sequence:
+                        self.db.delete_message(msg.id)
 
-        return last_user
+            return last_user
 
-    async def edit(self, new_message: str) -> Dict[str, Any]:
-        last_user = self._prepare_edit()
+    async def _replace_last_user_message(self, new_message: str) -> bool:
+        """Swap the last user message for new_message, keeping its attachments.
 
+        Returns False if the chat has no user message to replace.
+        """
+        last_user = await self._prepare_edit()
         if not last_user:
-            return {"error": "No user message to edit"}
+            return False
 
         file_ids_str = getattr(last_user, "file_ids", None)
         file_ids = json.loads(file_ids_str) if file_ids_str else []
 
         self.db.delete_message(last_user.id)
         await self._save_message("user", new_message, file_ids=file_ids)
+        return True
 
+    async def edit(self, new_message: str) -> Dict[str, Any]:
+        if not await self._replace_last_user_message(new_message):
+            return {"error": "No user message to edit"}
         return await self._loop(new_message)
 
     async def edit_stream(self, new_message: str, queue: asyncio.Queue) -> None:
-        last_user = self._prepare_edit()
-
-        if not last_user:
+        if not await self._replace_last_user_message(new_message):
             await queue.put(
                 StreamEvent(type="error", data={"message": "No user message to edit"})
             )
             await queue.put(STREAM_DONE)
             return
-
-        file_ids_str = getattr(last_user, "file_ids", None)
-        file_ids = json.loads(file_ids_str) if file_ids_str else []
-
-        self.db.delete_message(last_user.id)
-        await self._save_message("user", new_message, file_ids=file_ids)
-
         await self._loop(new_message, queue=queue)
 
     @staticmethod
-    def _format_message(msg: Message) -> dict:
+    def _format_message(msg: Message, tool_calls: Optional[List[Dict]] = None) -> dict:
+        if tool_calls is None and msg.tool_calls:
+            tool_calls = json.loads(msg.tool_calls)
         return {
             "id": msg.id,
             "role": msg.role,
             "content": msg.content,
             "reasoning_content": msg.reasoning_content,
-            "tool_calls": json.loads(msg.tool_calls) if msg.tool_calls else None,
+            "tool_calls": tool_calls,
             "tool_call_id": msg.tool_call_id,
             "sequence": msg.sequence,
             "created_at": msg.created_at.isoformat() if msg.created_at else None,
@@ -406,14 +471,7 @@ class BaseAgent(ABC):
                     content, reasoning, tool_calls = extract_assistant_content(
                         content_or_response
                     )
-                    tool_calls_json = json.dumps(tool_calls) if tool_calls else None
-                    return self.db.save_message(
-                        self.chat_id,
-                        "assistant",
-                        content,
-                        reasoning_content=reasoning,
-                        tool_calls=tool_calls_json,
-                    )
+                    return self._save_assistant_message(content, reasoning, tool_calls)
             else:
                 return self.db.save_message(
                     self.chat_id, "assistant", content_or_response
@@ -426,13 +484,23 @@ class BaseAgent(ABC):
                 tool_call_id=tool_call_id,
             )
         else:
-            file_ids_json = json.dumps(file_ids) if file_ids else None
-            msg = self.db.save_message(
-                self.chat_id, "user", content_or_response, file_ids=file_ids_json
+            return self.db.save_user_message(
+                self.chat_id, content_or_response, file_ids
             )
-            if file_ids:
-                self.db.attach_files(file_ids)
-            return msg
+
+    def _save_assistant_message(
+        self,
+        content: str,
+        reasoning: Optional[str],
+        tool_calls: Optional[List[Dict]],
+    ) -> Message:
+        return self.db.save_message(
+            self.chat_id,
+            "assistant",
+            content,
+            reasoning_content=reasoning,
+            tool_calls=json.dumps(tool_calls) if tool_calls else None,
+        )
 
     async def _build_context(self, message: str) -> List[ChatCompletionMessageParam]:
         mentioned_skills = parse_mentions(message)
@@ -453,7 +521,7 @@ class BaseAgent(ABC):
                     f"Activated skill tool servers for chat {self.chat_id}: {new_servers}"
                 )
 
-        messages = format_history(self.db, self.chat_id)
+        messages = await self._load_history()
         messages = apply_skill_context(messages, skill_context)
 
         if self.system_prompt:
@@ -462,25 +530,36 @@ class BaseAgent(ABC):
 
         return messages
 
+    async def _load_history(self) -> List[ChatCompletionMessageParam]:
+        """Return the converted chat history, converting only new messages."""
+        async with self._history_lock:
+            # Converting reads attachments from disk; the whole batch, however
+            # many messages and files it covers, costs one hop off the loop
+            new_messages, self._history_upto = await asyncio.to_thread(
+                format_history_since, self.db, self.chat_id, self._history_upto
+            )
+            self._history.extend(new_messages)
+            return list(self._history)
+
+    def _invalidate_history(self) -> None:
+        """Drop the converted history after messages were deleted.
+
+        Sequence numbers are reused once trailing messages are removed, so the
+        next turn has to rebuild the history from the start. Call with
+        _history_lock held, so a _load_history waiting on its conversion thread
+        can't store a stale _history_upto or extend the emptied history.
+        """
+        self._history = []
+        self._history_upto = None
+
     async def _get_tools(self, servers: List[str]) -> List[dict]:
         api_tools = []
         for tool_server in servers:
             tools = await self.tool_manager.list_tools(tool_server)
             for tool in tools:
-                if hasattr(tool, "parameters"):
-                    parameters = tool.parameters
-                else:
-                    parameters = {}
-                api_tools.append(
-                    {
-                        "type": "function",
-                        "function": {
-                            "name": f"{tool_server}__{tool.name}",
-                            "description": tool.description,
-                            "parameters": parameters,
-                        },
-                    }
-                )
+                tool_dict = tool_to_dict(tool)
+                tool_dict["name"] = f"{tool_server}__{tool_dict['name']}"
+                api_tools.append({"type": "function", "function": tool_dict})
         return api_tools
 
     async def _llm(
@@ -497,6 +576,24 @@ class BaseAgent(ABC):
         )
 
     async def _generate_title(self) -> None:
+        """Name the chat in the background; the reply never waits for it."""
+        if self._title_set or self._title_task is not None:
+            return
+        # The chat row is served from the DB's in-memory cache, so a rehydrated
+        # agent for an already named chat doesn't start a task just to find out
+        chat = self.db.get_chat(self.chat_id)
+        if chat is None or not needs_title(chat):
+            self._title_set = chat is not None
+            return
         client = self._title_llm_client or self._llm_client
         model = self._title_model_id or self.model_id
-        asyncio.create_task(generate_title(self.chat_id, self.db, client, model))
+        task = asyncio.create_task(generate_title(self.chat_id, self.db, client, model))
+        self._title_task = task
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+        task.add_done_callback(self._on_title_done)
+
+    def _on_title_done(self, task: asyncio.Task) -> None:
+        self._title_task = None
+        if not task.cancelled() and task.result():
+            self._title_set = True
@@ -1,12 +1,19 @@
-from .messages import format_history, parse_content, process_user_message
-from .naming import generate_title
+from .messages import (
+    format_history,
+    format_history_since,
+    parse_content,
+    process_user_message,
+)
+from .naming import generate_title, needs_title
 from .skills import apply_skill_context, build_skill_context, parse_mentions
 
 __all__ = [
     "format_history",
+    "format_history_since",
     "parse_content",
     "process_user_message",
     "generate_title",
+    "needs_title",
     "apply_skill_context",
     "build_skill_context",
     "parse_mentions",
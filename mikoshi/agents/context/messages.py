@@ -1,31 +1,95 @@
-import base64
+from __future__ import annotations
+
+import binascii
 import json
 import logging
 import os
-from typing import Any, Dict, List
-
-from openai.types.chat import ChatCompletionMessageParam
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
 
 from mikoshi.db.db import Database
+from mikoshi.db.models import File
+
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletionMessageParam
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on attachments of one message read from disk at the same time
+MAX_ATTACHMENT_WORKERS = 8
+
+# Images are encoded in slices of this many bytes; a multiple of 3 keeps the
+# base64 output of each slice free of padding so the pieces concatenate cleanly
+BASE64_CHUNK_SIZE = 57 * 4096
+
+# Text attachments are read this many characters at a time
+TEXT_READ_CHUNK_SIZE = 64 * 1024
+
+# Budget for encoded image data URLs kept between history rebuilds
+IMAGE_URL_CACHE_BYTES = 64 * 1024 * 1024
+_image_urls: OrderedDict[Tuple[str, int, int], str] = OrderedDict()
+_image_urls_size = 0
+_image_urls_lock = threading.Lock()
+
+
+@cache
+def _attachment_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(
+        max_workers=min(MAX_ATTACHMENT_WORKERS, os.cpu_count() or 1),
+        thread_name_prefix="attachments",
+    )
+
+
+def _may_be_json(value: str) -> bool:
+    """Cheap check for content that could be stored structured content.
+
+    Structured content is saved as a JSON list, object or string; anything
+    else is plain text and not worth a json.loads that raises.
+    """
+    first = value[:1]
+    if first.isspace():
+        first = value.lstrip()[:1]
+    return first in ("[", "{", '"')
+
 
 def parse_content(msg_content: str):
     """Parse message content from JSON or return as plain string."""
+    # Plain text is the common case; raising and catching JSONDecodeError for
+    # every plain message costs more than the check
+    if not isinstance(msg_content, str) or not _may_be_json(msg_content):
+        return msg_content
     try:
         return json.loads(msg_content)
-    except (json.JSONDecodeError, TypeError):
+    except json.JSONDecodeError:
         return msg_content
 
 
 def extract_text_content(raw_content: str) -> str:
     """Decode message content to plain text regardless of storage format."""
-    content = parse_content(raw_content)
+    return _content_text(parse_content(raw_content))
+
+
+def _content_text(content: Any) -> str:
     if isinstance(content, str):
         return content
     if isinstance(content, list):
-        return " ".join(p.get("text", "") for p in content if p.get("type") == "text")
+        return " ".join(
+            p.get("text", "")
+            for p in content
+            if isinstance(p, dict) and p.get("type") == "text"
+        )
     return str(content)
 
 
@@ -65,25 +129,33 @@ def extract_assistant_content(
     return content, reasoning_content, None
 
 
-def process_user_message(db: Database, msg) -> ChatCompletionMessageParam:
+def _message_file_ids(msg) -> List[str]:
+    file_ids_str = getattr(msg, "file_ids", None)
+    if not file_ids_str:
+        return []
+    try:
+        return json.loads(file_ids_str)
+    except json.JSONDecodeError:
+        return []
+
+
+def process_user_message(
+    db: Database, msg, files_by_id: Optional[Dict[str, File]] = None
+) -> ChatCompletionMessageParam:
     """Process user message and reconstruct content with attachments.
 
     Handles text files (appended to content) and images (encoded as base64).
+    Attachments are looked up in files_by_id when given, otherwise in the DB.
     """
     content = parse_content(msg.content)
-
-    file_ids_str = getattr(msg, "file_ids", None)
-    file_ids = []
-    if file_ids_str:
-        try:
-            file_ids = json.loads(file_ids_str)
-        except json.JSONDecodeError:
-            pass
+    file_ids = _message_file_ids(msg)
 
     files = []
     if file_ids:
+        if files_by_id is None:
+            files_by_id = db.get_files(file_ids)
         for fid in file_ids:
-            f = db.get_file(fid)
+            f = files_by_id.get(fid)
             if f:
                 files.append(f)
             else:
@@ -92,12 +164,17 @@ def process_user_message(db: Database, msg) -> ChatCompletionMessageParam:
     if not files:
         return {"role": "user", "content": content}
 
-    content_text = content if isinstance(content, str) else ""
-    if not isinstance(content, str):
-        for part in content:
-            if isinstance(part, dict) and part.get("type") == "text":
-                content_text = part.get("text", "")
-                break
+    if isinstance(content, str):
+        content_text = content
+    else:
+        content_text = next(
+            (
+                part.get("text", "")
+                for part in content
+                if isinstance(part, dict) and part.get("type") == "text"
+            ),
+            "",
+        )
 
     text_files = []
     image_files = []
@@ -107,87 +184,200 @@ def process_user_message(db: Database, msg) -> ChatCompletionMessageParam:
         else:
             text_files.append(attachment)
 
+    if len(files) == 1:
+        text_contents = [_read_text(a) for a in text_files]
+        image_parts = [_encode_image(a) for a in image_files]
+    else:
+        # Read all attachments of one message concurrently
+        pool = _attachment_pool()
+        text_futures = [pool.submit(_read_text, a) for a in text_files]
+        image_futures = [pool.submit(_encode_image, a) for a in image_files]
+        text_contents = [f.result() for f in text_futures]
+        image_parts = [f.result() for f in image_futures]
+
     if text_files:
-        content_text += "\n\n--- Attached Text Files ---\n"
-    for attachment in text_files:
-        if not os.path.exists(attachment.file_path):
-            continue
-        try:
-            with open(attachment.file_path, "r", encoding="utf-8") as f:
-                file_content = f.read()
-            filename = os.path.basename(attachment.file_path)
-            content_text += f"\n\n--- Content of {filename} ---\n{file_content}"
-        except Exception as e:
-            logger.error(f"Failed to read attachment {attachment.file_path}: {e}")
+        # Collect the pieces and join once; repeated += copies the growing text
+        parts = [content_text, "\n\n--- Attached Text Files ---\n"]
+        for attachment, chunks in zip(text_files, text_contents):
+            if chunks is not None:
+                # The header and file chunks are separate parts, so the file's
+                # text is only copied once, by the final join. The stored name
+                # is the basename the file was saved under
+                parts.append(f"\n\n--- Content of {attachment.filename} ---\n")
+                parts.extend(chunks)
+        content_text = "".join(parts)
 
     if not image_files:
         return {"role": "user", "content": content_text}
 
     content_parts: List[Dict[str, Any]] = [{"type": "text", "text": content_text}]
-
-    for attachment in image_files:
-        if not os.path.exists(attachment.file_path):
-            continue
-        try:
-            with open(attachment.file_path, "rb") as f:
-                img_data = base64.b64encode(f.read()).decode()
-            ext = os.path.splitext(attachment.file_path)[1].lower().lstrip(".")
-            image_format = "jpeg" if ext in ("jpg", "jpeg") else ext or "jpeg"
-            content_parts.append(
-                {
-                    "type": "image_url",
-                    "image_url": {
-                        "url": f"data:image/{image_format};base64,{img_data}"
-                    },
-                }
-            )
-        except Exception as e:
-            logger.error(f"Failed to read image {attachment.file_path}: {e}")
+    content_parts.extend(part for part in image_parts if part is not None)
 
     return {"role": "user", "content": content_parts}
 
 
+def _read_text(attachment: File) -> Optional[List[str]]:
+    """Read a text attachment in chunks, or return None if it is missing or unreadable.
+
+    Reading in chunks avoids holding the whole raw file next to its decoded
+    text, as a single read() does.
+    """
+    # Opening directly replaces a separate exists() check and its extra stat
+    try:
+        with open(attachment.file_path, "r", encoding="utf-8") as f:
+            return list(iter(lambda: f.read(TEXT_READ_CHUNK_SIZE), ""))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.error(f"Failed to read attachment {attachment.file_path}: {e}")
+        return None
+
+
+def _encode_image(attachment: File) -> Optional[Dict[str, Any]]:
+    """Read an image attachment into an image_url content part.
+
+    Encoded data URLs are cached by (path, mtime, size), so rebuilding a
+    history (after a retry or edit, or when an agent is rehydrated) doesn't
+    re-encode images that haven't changed.
+    """
+    file_path = attachment.file_path
+    try:
+        with open(file_path, "rb") as f:
+            st = os.fstat(f.fileno())
+            key = (file_path, st.st_mtime_ns, st.st_size)
+            url = _cached_image_url(key)
+            if url is None:
+                # The MIME type was detected once at upload and stored with the file
+                prefix = f"data:{attachment.content_type};base64,".encode("ascii")
+                url = _base64_file(f, prefix)
+                _cache_image_url(key, url)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.error(f"Failed to read image {file_path}: {e}")
+        return None
+    return {"type": "image_url", "image_url": {"url": url}}
+
+
+def _base64_file(f, prefix: bytes = b"") -> str:
+    """Base64-encode an open file, returned after the given ASCII prefix."""
+    # Encode while reading so the raw image is never held in memory whole.
+    # Slices are read into one reused buffer and passed straight to the C
+    # encoder, skipping base64.b64encode's argument handling per slice. The
+    # prefix starts the same buffer, so the result is decoded once rather than
+    # concatenated onto the prefix afterwards, which would copy it again
+    encoded = bytearray(prefix)
+    buf = bytearray(BASE64_CHUNK_SIZE)
+    view = memoryview(buf)
+    while n := f.readinto(buf):
+        encoded += binascii.b2a_base64(view[:n], newline=False)
+    return encoded.decode("ascii")
+
+
+def _cached_image_url(key: Tuple[str, int, int]) -> Optional[str]:
+    with _image_urls_lock:
+        url = _image_urls.get(key)
+        if url is not None:
+            _image_urls.move_to_end(key)
+        return url
+
+
+def _cache_image_url(key: Tuple[str, int, int], url: str) -> None:
+    global _image_urls_size
+    # A single image larger than a quarter of the budget would flush most of it
+    if len(url) > IMAGE_URL_CACHE_BYTES // 4:
+        return
+    with _image_urls_lock:
+        if key in _image_urls:
+            return
+        _image_urls[key] = url
+        _image_urls_size += len(url)
+        while _image_urls_size > IMAGE_URL_CACHE_BYTES:
+            _, evicted = _image_urls.popitem(last=False)
+            _image_urls_size -= len(evicted)
+
+
+def _format_assistant(msg) -> ChatCompletionMessageParam:
+    content = parse_content(msg.content)
+    msg_dict: Dict[str, Any] = {"role": "assistant", "content": content}
+    if msg.tool_calls:
+        tool_calls_data = json.loads(msg.tool_calls)
+        msg_dict["tool_calls"] = [
+            {
+                "id": tc.get("id", f"call_{i}"),
+                "type": "function",
+                "function": {
+                    "name": tc["name"],
+                    "arguments": json.dumps(tc["arguments"])
+                    if isinstance(tc["arguments"], dict)
+                    else tc["arguments"],
+                },
+            }
+            for i, tc in enumerate(tool_calls_data)
+        ]
+    return msg_dict
+
+
+def _format_tool(msg) -> ChatCompletionMessageParam:
+    return {
+        "role": "tool",
+        "tool_call_id": msg.tool_call_id or "unknown",
+        "content": parse_content(msg.content),
+    }
+
+
+def _format_system(msg) -> ChatCompletionMessageParam:
+    return {"role": "system", "content": parse_content(msg.content)}
+
+
+# Converters for roles other than user, which also needs the attachments;
+# roles not listed here are not sent to the model
+_FORMATTERS: Dict[str, Callable[[Any], ChatCompletionMessageParam]] = {
+    "assistant": _format_assistant,
+    "tool": _format_tool,
+    "system": _format_system,
+}
+
+
 def format_history(db: Database, chat_id: str) -> List[ChatCompletionMessageParam]:
     """Format chat history from DB into OpenAI message format.
 
     Handles user messages with attachments, assistant and system messages,
     and tool result messages.
     """
-    history = db.get_chat_history(chat_id)
-    messages: List[ChatCompletionMessageParam] = []
+    messages, _ = format_history_since(db, chat_id, None)
+    return messages
+
 
+def format_history_since(
+    db: Database, chat_id: str, after_sequence: Optional[int]
+) -> Tuple[List[ChatCompletionMessageParam], Optional[int]]:
+    """Format the messages stored after `after_sequence`.
+
+    Returns the formatted messages and the sequence number of the last message
+    read, to be passed back on the next call. With after_sequence=None the
+    whole history is formatted.
+
+    This blocks on DB and attachment I/O; run it with a single asyncio.to_thread
+    call rather than offloading individual messages or files from the loop.
+    """
+    history: Iterable = db.iter_chat_history(chat_id, after_sequence=after_sequence)
+    if after_sequence is None:
+        files_by_id = db.get_chat_files(chat_id)
+    else:
+        # Only a few new messages; fetch just their attachments, in one query
+        history = list(history)
+        file_ids = [fid for msg in history for fid in _message_file_ids(msg)]
+        files_by_id = db.get_files(file_ids) if file_ids else {}
+    formatters = _FORMATTERS
+    messages: List[ChatCompletionMessageParam] = []
+    last_sequence = after_sequence
     for msg in history:
+        last_sequence = msg.sequence
         if msg.role == "user":
-            messages.append(process_user_message(db, msg))
-        elif msg.role == "assistant":
-            content = parse_content(msg.content)
-            msg_dict: Dict[str, Any] = {"role": "assistant", "content": content}
-            if msg.tool_calls:
-                tool_calls_data = json.loads(msg.tool_calls)
-                msg_dict["tool_calls"] = [
-                    {
-                        "id": tc.get("id", f"call_{i}"),
-                        "type": "function",
-                        "function": {
-                            "name": tc["name"],
-                            "arguments": json.dumps(tc["arguments"])
-                            if isinstance(tc["arguments"], dict)
-                            else tc["arguments"],
-                        },
-                    }
-                    for i, tc in enumerate(tool_calls_data)
-                ]
-            messages.append(msg_dict)
-        elif msg.role == "tool":
-            messages.append(
-                {
-                    "role": "tool",
-                    "tool_call_id": msg.tool_call_id or "unknown",
-                    "content": parse_content(msg.content),
-                }
-            )
-        elif msg.role == "system":
-            content = parse_content(msg.content)
-            messages.append({"role": "system", "content": content})
-
-    return messages
+            messages.append(process_user_message(db, msg, files_by_id))
+            continue
+        formatter = formatters.get(msg.role)
+        if formatter is not None:
+            messages.append(formatter(msg))
+    return messages, last_sequence
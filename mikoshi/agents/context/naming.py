@@ -1,14 +1,27 @@
-import logging
-from typing import List
+from __future__ import annotations
 
-from openai.types.chat import ChatCompletionMessageParam
+import logging
+from typing import TYPE_CHECKING, List
 
 from mikoshi.agents.context.messages import extract_text_content
 from mikoshi.db.db import Database
+from mikoshi.db.models import Chat
 from mikoshi.providers.clients import LLMClient
 
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletionMessageParam
+
 logger = logging.getLogger(__name__)
 
+# Titles that mean the chat hasn't been named yet
+PLACEHOLDER_TITLES = (None, "", "Untitled Chat")
+
+# Only the opening of the conversation is used to name it
+TITLE_HISTORY_MESSAGES = 6
+# Cap on conversation text sent to the naming model, so a huge first message
+# doesn't turn a title request into a full-cost completion
+MAX_CONVERSATION_CHARS = 2000
+
 SYSTEM_PROMPT = """You are a high-level intent-extraction engine. Your task is to generate a concise, 3-5 word title for a conversation.
 
 CRITICAL GUIDELINE: Focus on the User's Goal, not the system's technical response. Even if a tool fails, an error occurs, or the AI cannot fulfill a request, the title must reflect what the user was attempting to do.
@@ -25,8 +38,15 @@ DO NOT: Reference errors, status codes, or "Log" unless the user specifically as
 DO NOT: Use quotes.
 Output ONLY the title."""
 
-USER_PROMPT_TEMPLATE = """Review the following exchange and identify the user's primary objective. Generate a 3-5 word title:
-{conversation}"""
+# The conversation is appended to this prefix; plain concatenation is all the
+# single substitution needs
+USER_PROMPT_PREFIX = """Review the following exchange and identify the user's primary objective. Generate a 3-5 word title:
+"""
+
+
+def needs_title(chat: Chat) -> bool:
+    """Whether the chat still has a placeholder title."""
+    return chat.title in PLACEHOLDER_TITLES
 
 
 async def generate_title(
@@ -34,32 +54,36 @@ async def generate_title(
     db: Database,
     llm_client: LLMClient,
     model_id: str,
-) -> None:
+) -> bool:
     """Generate a title for the chat if it's still 'Untitled Chat'.
 
     This is meant to be run as a background task after the first exchange.
+    Returns True if the chat has a title afterwards.
     """
     try:
         chat = db.get_chat(chat_id)
-        if not chat or chat.title not in (None, "", "Untitled Chat"):
-            return
+        if not chat:
+            return False
+        if not needs_title(chat):
+            return True
 
-        history = db.get_chat_history(chat_id)
+        history = db.get_chat_history(chat_id, limit=TITLE_HISTORY_MESSAGES)
         if not history or len(history) < 1:
-            return
-
-        conversation_text = ""
-        for msg in history[:6]:
-            if msg.role in ["user", "assistant"]:
-                content_str = extract_text_content(msg.content)
-                conversation_text += f"{msg.role.capitalize()}: {content_str}\n"
-
+            return False
+
+        lines = [USER_PROMPT_PREFIX]
+        remaining = MAX_CONVERSATION_CHARS
+        for msg in history:
+            if msg.role not in ("user", "assistant"):
+                continue
+            text = extract_text_content(msg.content)[:remaining]
+            lines.append(f"{msg.role.capitalize()}: {text}\n")
+            remaining -= len(text)
+            if remaining <= 0:
+                break
         messages: List[ChatCompletionMessageParam] = [
             {"role": "system", "content": SYSTEM_PROMPT},
-            {
-                "role": "user",
-                "content": USER_PROMPT_TEMPLATE.format(conversation=conversation_text),
-            },
+            {"role": "user", "content": "".join(lines)},
         ]
 
         response = await llm_client.chat_completion(
@@ -76,5 +100,7 @@ async def generate_title(
                 if title:
                     logger.info(f"Generated chat title: '{title}'")
                     db.update_chat(chat_id, title=title)
+                    return True
     except Exception as e:
         logger.warning(f"Failed to generate title for chat {chat_id}: {e}")
+    return False
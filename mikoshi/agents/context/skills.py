@@ -1,18 +1,22 @@
+from __future__ import annotations
+
 import logging
 import re
-from typing import List, Optional, Tuple
-
-from openai.types.chat import ChatCompletionMessageParam
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
 from mikoshi.skills.registry import SkillRegistry
 
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletionMessageParam
+
 logger = logging.getLogger(__name__)
 
+_MENTION_RE = re.compile(r"@([a-zA-Z0-9_]+)")
+
 
 def parse_mentions(message: str) -> List[str]:
     """Extract @mentions from a message."""
-    pattern = r"@([a-zA-Z0-9_]+)"
-    return re.findall(pattern, message)
+    return _MENTION_RE.findall(message)
 
 
 def build_skill_context(
@@ -27,9 +31,11 @@ def build_skill_context(
         return "", []
 
     skill_context_parts = []
-    required_tool_servers = []
+    # Ordered set; two skills may require the same server
+    required_tool_servers: dict[str, None] = {}
 
-    for skill_name in skill_names:
+    # A skill mentioned twice is only added to the context once
+    for skill_name in dict.fromkeys(skill_names):
         skill = skill_registry.get_skill(skill_name)
         if skill:
             try:
@@ -40,7 +46,7 @@ def build_skill_context(
                 logger.info(f"Loaded skill @{skill_name} for context")
                 tool_servers = skill.get_required_tool_servers()
                 if tool_servers:
-                    required_tool_servers.extend(tool_servers)
+                    required_tool_servers.update(dict.fromkeys(tool_servers))
                     logger.info(
                         f"Skill @{skill_name} requires tool servers: {tool_servers}"
                     )
@@ -50,7 +56,7 @@ def build_skill_context(
             logger.debug(f"Skill @{skill_name} not found, treating as plain text")
 
     context_str = "\n".join(skill_context_parts) if skill_context_parts else ""
-    return context_str, required_tool_servers
+    return context_str, list(required_tool_servers)
 
 
 def apply_skill_context(
@@ -62,10 +68,11 @@ def apply_skill_context(
 
     if messages and messages[0].get("role") in ("system", "developer"):
         existing_content = messages[0].get("content", "")
-        if isinstance(existing_content, str):
-            messages[0]["content"] = existing_content + skill_context
-        else:
-            messages[0]["content"] = str(existing_content) + skill_context
+        if not isinstance(existing_content, str):
+            existing_content = str(existing_content)
+        # Replace rather than update the message, which may be shared with the
+        # agent's cached history
+        messages[0] = {**messages[0], "content": existing_content + skill_context}
     else:
         messages.insert(0, {"role": "system", "content": skill_context.strip()})
 
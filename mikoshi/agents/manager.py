@@ -1,14 +1,17 @@
 import importlib.util
 import inspect
 import logging
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Optional, Type
+from typing import Dict, List, Optional, Type
 
-from mikoshi.agents.base import BaseAgent
+from mikoshi.agents.base import BaseAgent, drain_background_tasks
 from mikoshi.agents.react import ReActAgent, ReActAgentPlugin
 from mikoshi.agents.structured import StructuredAgentPlugin
 from mikoshi.config import TitleGenerationConfig, WorkspaceConfig
 from mikoshi.db.db import Database
+from mikoshi.db.models import Chat
 from mikoshi.providers.registry import ProviderRegistry
 from mikoshi.skills.registry import SkillRegistry
 from mikoshi.tools.manager import ToolManager
@@ -17,6 +20,38 @@ from mikoshi.workspace import WorkspaceService
 
 logger = logging.getLogger(__name__)
 
+# Agents kept in memory; least recently used ones are rehydrated from the DB
+MAX_CACHED_AGENTS = 128
+
+
+@dataclass(frozen=True)
+class AgentDescriptor:
+    """Static configuration snapshot of a registered agent class."""
+
+    name: str
+    system_prompt: str
+    provider: str
+    model_id: str
+    tool_servers: tuple
+    temperature: Optional[float]
+    max_tokens: Optional[int]
+    max_iterations: int
+
+    @classmethod
+    def from_class(
+        cls, name: str, agent_cls: Type[ReActAgentPlugin | StructuredAgentPlugin]
+    ) -> "AgentDescriptor":
+        return cls(
+            name=name,
+            system_prompt=agent_cls.system_prompt,
+            provider=agent_cls.provider_id,
+            model_id=agent_cls.model_id,
+            tool_servers=tuple(agent_cls.tool_servers),
+            temperature=agent_cls.temperature,
+            max_tokens=agent_cls.max_tokens,
+            max_iterations=agent_cls.max_iterations,
+        )
+
 
 class AgentRegistry:
     """Discovers and registers agent plugin classes from a directory."""
@@ -33,6 +68,7 @@ class AgentRegistry:
         self._agent_classes: Dict[
             str, Type[ReActAgentPlugin | StructuredAgentPlugin]
         ] = {}
+        self._descriptors: Dict[str, AgentDescriptor] = {}
         self._register_agents()
 
     def _register_agents(self):
@@ -84,16 +120,22 @@ class AgentRegistry:
                         continue
 
                     agent_name = obj.name if obj.name else name.lower()
-                    self._agent_classes[agent_name] = obj
+                    self._add_agent_class(agent_name, obj)
                     logger.info(
-                        f"Registered agent class: {agent_name} from {file_path.name}"
+                        "Registered agent class: %s from %s", agent_name, file_path.name
                     )
             except Exception as e:
                 logger.error(
                     f"Failed to load module from {file_path}: {e}", exc_info=True
                 )
 
-        logger.info(f"Registered {len(self._agent_classes)} agent(s)")
+        logger.info("Registered %d agent(s)", len(self._agent_classes))
+
+    def _add_agent_class(
+        self, name: str, agent_cls: Type[ReActAgentPlugin | StructuredAgentPlugin]
+    ) -> None:
+        self._agent_classes[name] = agent_cls
+        self._descriptors[name] = AgentDescriptor.from_class(name, agent_cls)
 
     def get_agent_class(
         self, name: str
@@ -105,6 +147,10 @@ class AgentRegistry:
         """List all registered agent names."""
         return list(self._agent_classes.keys())
 
+    def list_agent_descriptors(self) -> List[AgentDescriptor]:
+        """List configuration snapshots of all registered agents."""
+        return list(self._descriptors.values())
+
     def get_default_agent_name(self) -> Optional[str]:
         """Return the name of the first registered agent class with default=True."""
         for name, cls in self._agent_classes.items():
@@ -137,7 +183,7 @@ class AgentManager:
         self.data_dir = data_dir
         self.workspace_config = workspace_config
         self.workspace_service = workspace_service
-        self._agents: Dict[str, BaseAgent] = {}
+        self._agents: OrderedDict[str, BaseAgent] = OrderedDict()
 
     def _resolve_agent_params(
         self,
@@ -187,13 +233,19 @@ class AgentManager:
             "title_model_id": self.title_generation.model,
         }
 
-    def _hydrate(self, chat_id: str, config: dict) -> BaseAgent:
-        """Instantiate agent from config dict without persisting."""
+    def _hydrate(
+        self, chat_id: str, config: dict, chat: Optional[Chat] = None
+    ) -> BaseAgent:
+        """Instantiate agent from config dict without persisting.
+
+        Callers that already loaded the chat row pass it in to avoid a second query.
+        """
         model = config.get("model")
         if not model:
             raise ValueError("Model is required")
 
-        chat = self.db.get_chat(chat_id)
+        if chat is None:
+            chat = self.db.get_chat(chat_id)
         workspace_id = chat.workspace_id if chat else None
         connector_name = None
         if workspace_id:
@@ -280,8 +332,8 @@ class AgentManager:
         if not chat:
             raise ValueError(f"Chat '{chat_id}' not found")
 
-        agent = self._hydrate(chat_id, config)
-        self._agents[chat_id] = agent
+        agent = self._hydrate(chat_id, config, chat)
+        self._cache_agent(chat_id, agent)
 
         model = config.get("model")
 
@@ -302,19 +354,43 @@ class AgentManager:
         return agent
 
     def get(self, chat_id: str) -> BaseAgent:
-        """Get agent for chat, hydrating from DB config if not in memory."""
+        """Get agent for chat, hydrating from DB config if not in memory.
+
+        There is no await between the cache check and the store, so concurrent
+        requests for the same chat on the event loop can't both hydrate it.
+        """
         agent = self._agents.get(chat_id)
         if agent:
+            self._agents.move_to_end(chat_id)
             return agent
 
-        config_dict = self.db.get_chat_config(chat_id)
-        if not config_dict:
+        chat = self.db.get_chat(chat_id)
+        if not chat:
             raise ValueError(f"Chat '{chat_id}' not found")
 
-        agent = self._hydrate(chat_id, config_dict)
-        self._agents[chat_id] = agent
+        agent = self._hydrate(chat_id, self.db.chat_config(chat), chat)
+        self._cache_agent(chat_id, agent)
         return agent
 
+    def _cache_agent(self, chat_id: str, agent: BaseAgent) -> None:
+        # Agents hold no resources of their own (LLM clients belong to the
+        # providers), so evicted ones are simply dropped. Busy agents are kept:
+        # a second agent hydrated for the same chat would start with empty
+        # history and title state and run alongside the first
+        self._agents[chat_id] = agent
+        if len(self._agents) <= MAX_CACHED_AGENTS:
+            return
+        for cached_id, cached in self._agents.items():
+            if cached_id != chat_id and not cached.busy:
+                del self._agents[cached_id]
+                logger.debug("Evicted agent for chat %s from memory", cached_id)
+                return
+        logger.debug("All cached agents are busy; keeping %d", len(self._agents))
+
+    async def drain(self) -> None:
+        """Let background work started by agents finish before shutdown."""
+        await drain_background_tasks()
+
     def remove(self, chat_id: str) -> None:
         """Remove agent from memory."""
         if chat_id in self._agents:
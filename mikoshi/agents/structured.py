@@ -1,8 +1,8 @@
+from __future__ import annotations
+
 import json
 import logging
-from typing import Any, Dict, List, Optional
-
-from openai.types.chat import ChatCompletionMessageParam
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 from mikoshi.agents.base import BaseAgent
 from mikoshi.agents.streaming import STREAM_DONE, StreamEvent
@@ -11,6 +11,9 @@ from mikoshi.providers.provider import Provider
 from mikoshi.skills.registry import SkillRegistry
 from mikoshi.tools.manager import ToolManager
 
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletionMessageParam
+
 logger = logging.getLogger(__name__)
 
 
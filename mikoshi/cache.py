@@ -0,0 +1,127 @@
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import Request, Response
+
+logger = logging.getLogger(__name__)
+
+# Added to the measured generation time before clamping to the policy bounds
+TTL_BUFFER = 1.0
+
+# json.dumps builds a new encoder whenever options are passed; build it once
+_encoder = json.JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+
+class CachePolicy(Enum):
+    """Freshness bounds (min, max seconds) for cached responses."""
+
+    SHORT = (1.0, 10.0)
+    NORMAL = (10.0, 30.0)
+    LONG = (30.0, 60.0)
+    # Never expires; for responses built only from state fixed at startup
+    STATIC = (math.inf, math.inf)
+
+    def ttl(self, elapsed: float) -> float:
+        """Freshness lifetime for a response that took `elapsed` seconds to build."""
+        min_ttl, max_ttl = self.value
+        return min(max(elapsed + TTL_BUFFER, min_ttl), max_ttl)
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    expires_at: float
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    """A JSON response body serialized once, with its strong ETag."""
+
+    body: bytes
+    etag: str
+
+    @classmethod
+    def from_payload(cls, payload: Any) -> "CachedBody":
+        body = _encoder.encode(payload).encode("utf-8")
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        return cls(body=body, etag=etag)
+
+    def to_response(self, request: Request) -> Response:
+        """Build the response, answering 304 if the client already has this body."""
+        # Clients revalidate every time so regenerated bodies are picked up immediately
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if request.headers.get("if-none-match") == self.etag:
+            return Response(status_code=304, headers=headers)
+        return Response(self.body, media_type="application/json", headers=headers)
+
+
+class ResponseCache:
+    """In-process cache for endpoint responses that are expensive to regenerate.
+
+    Expired entries are kept around so they can be served when regeneration fails.
+    Regeneration is single-flight per key: concurrent misses wait for the first
+    caller instead of rebuilding the same response in parallel.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, CacheEntry] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def get_or_generate_body(
+        self,
+        key: str,
+        policy: CachePolicy,
+        generate: Callable[[], Awaitable[Any]],
+    ) -> CachedBody:
+        """Like get_or_generate, but caches the serialized JSON body."""
+
+        async def generate_body() -> CachedBody:
+            return CachedBody.from_payload(await generate())
+
+        return await self.get_or_generate(key, policy, generate_body)
+
+    async def get_or_generate(
+        self,
+        key: str,
+        policy: CachePolicy,
+        generate: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() < entry.expires_at:
+            return entry.value
+
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            # Another request may have refreshed the entry while we waited
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() < entry.expires_at:
+                return entry.value
+            return await self._generate(key, policy, generate, entry)
+
+    async def _generate(
+        self,
+        key: str,
+        policy: CachePolicy,
+        generate: Callable[[], Awaitable[Any]],
+        entry: Optional[CacheEntry],
+    ) -> Any:
+        start = time.perf_counter()
+        try:
+            value = await generate()
+        except Exception as e:
+            if entry is None:
+                raise
+            logger.warning("Serving stale '%s' response, refresh failed: %s", key, e)
+            return entry.value
+        elapsed = time.perf_counter() - start
+
+        self._entries[key] = CacheEntry(
+            value=value, expires_at=time.monotonic() + policy.ttl(elapsed)
+        )
+        return value
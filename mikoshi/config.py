@@ -120,6 +120,8 @@ class AppConfig(BaseModel):
     audio: AudioConfig = AudioConfig()
     logging: LoggingConfig = LoggingConfig()
     file_retention_hours: int = 24
+    max_upload_mb: int = 50
+    llm_max_concurrency: int = 64
     title_generation: TitleGenerationConfig = TitleGenerationConfig()
     workspace: WorkspaceConfig = WorkspaceConfig()
 
@@ -53,6 +53,19 @@ class ConnectorClient(ABC):
         """
         ...
 
+    async def list_all_files(self, repo: str, ref: str = "HEAD") -> List[str] | None:
+        """List every file path in a repository with a single request
+
+        Args:
+            repo: Repository identifier
+            ref: Git reference (branch, tag, or commit) to list
+
+        Returns:
+            File paths, or None if the connector can't list the whole tree at
+            once, in which case callers walk it with browse_tree
+        """
+        return None
+
     @abstractmethod
     async def get_file_content(self, repo: str, path: str) -> bytes:
         """Fetch raw file content from a repository
@@ -128,6 +128,41 @@ class ForgejoClient(ConnectorClient):
             logger.error(f"Failed to browse tree for {repo} at {path}: {e}")
             raise
 
+    async def list_all_files(self, repo: str, ref: str = "HEAD") -> List[str] | None:
+        """List every file in the repository via the recursive git trees API
+
+        Gitea pages large trees instead of truncating them, so this may take a
+        few requests, still far fewer than one per directory.
+
+        Args:
+            repo: Repository in format "owner/repo"
+            ref: Git reference (branch, tag, or commit) to list
+
+        Returns:
+            File paths in the repository
+        """
+        if ref == "HEAD":
+            # The trees endpoint resolves branch names and SHAs, not HEAD
+            response = await self.client.get(f"{self.base_url}/repos/{repo}")
+            response.raise_for_status()
+            ref = response.json()["default_branch"]
+
+        files = []
+        page = 1
+        while True:
+            response = await self.client.get(
+                f"{self.base_url}/repos/{repo}/git/trees/{ref}",
+                params={"recursive": "true", "page": page},
+            )
+            response.raise_for_status()
+            tree_data = response.json()
+            entries = tree_data.get("tree") or []
+            files.extend(entry["path"] for entry in entries if entry["type"] == "blob")
+            if not tree_data.get("truncated") or not entries:
+                break
+            page += 1
+        return files
+
     async def get_file_content(self, repo: str, path: str) -> bytes:
         """Fetch raw file content from a repository
 
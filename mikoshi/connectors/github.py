@@ -1,6 +1,9 @@
 import base64
 import logging
-from typing import Dict, List
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
 
 import httpx
 
@@ -8,6 +11,18 @@ from mikoshi.connectors.client_base import ConnectorClient, FileNode, TokenEstim
 
 logger = logging.getLogger(__name__)
 
+# Fetched file contents are reused without a request for this many seconds,
+# then revalidated with their ETag
+CONTENT_CACHE_TTL = 600.0
+CONTENT_CACHE_SIZE = 512
+
+
+@dataclass
+class _CachedContent:
+    content: bytes
+    etag: Optional[str]
+    expires_at: float
+
 
 class GitHubClient(ConnectorClient):
     """Client for interacting with GitHub REST API"""
@@ -32,6 +47,7 @@ class GitHubClient(ConnectorClient):
             timeout=30.0,
         )
         self._token_cache: Dict[tuple, int] = {}
+        self._content_cache: OrderedDict[tuple, _CachedContent] = OrderedDict()
 
     async def authenticate(self) -> bool:
         """Verify that the token is valid
@@ -129,6 +145,27 @@ class GitHubClient(ConnectorClient):
             logger.error(f"Failed to browse tree for {repo} at {path}: {e}")
             raise
 
+    async def list_all_files(self, repo: str, ref: str = "HEAD") -> List[str] | None:
+        """List every file in the repository via the recursive git trees API
+
+        Args:
+            repo: Repository in format "owner/repo"
+            ref: Git reference (branch, tag, or commit) to list
+
+        Returns:
+            File paths, or None if GitHub truncated the listing
+        """
+        response = await self.client.get(
+            f"{self.base_url}/repos/{repo}/git/trees/{ref}",
+            params={"recursive": "1"},
+        )
+        response.raise_for_status()
+        tree_data = response.json()
+        if tree_data.get("truncated"):
+            logger.debug("Recursive tree for %s is truncated", repo)
+            return None
+        return [entry["path"] for entry in tree_data["tree"] if entry["type"] == "blob"]
+
     async def get_file_content(self, repo: str, path: str) -> bytes:
         """Fetch raw file content from a repository
 
@@ -140,17 +177,10 @@ class GitHubClient(ConnectorClient):
             Raw bytes of the file content
         """
         try:
-            url = f"{self.base_url}/repos/{repo}/contents/{path}"
-            response = await self.client.get(url)
-            response.raise_for_status()
-            content_data = response.json()
-
-            if "content" in content_data:
-                encoded_content = content_data["content"]
-                encoded_content = encoded_content.replace("\n", "")
-                return base64.b64decode(encoded_content)
-            else:
+            content = await self._get_contents(repo, path)
+            if content is None:
                 raise ValueError(f"No content found for {path} in {repo}")
+            return content
         except Exception as e:
             logger.error(f"Failed to get file content for {path} in {repo}: {e}")
             raise
@@ -169,16 +199,9 @@ class GitHubClient(ConnectorClient):
             file_contents = {}
 
             for path in paths:
-                url = f"{self.base_url}/repos/{repo}/contents/{path}"
-                response = await self.client.get(url)
-                response.raise_for_status()
-                content_data = response.json()
-
-                if "content" in content_data:
-                    encoded_content = content_data["content"]
-                    encoded_content = encoded_content.replace("\n", "")
-                    decoded_content = base64.b64decode(encoded_content).decode("utf-8")
-                    file_contents[path] = decoded_content
+                content = await self._get_contents(repo, path)
+                if content is not None:
+                    file_contents[path] = content.decode("utf-8")
                 else:
                     logger.warning(f"No content found for {path} in {repo}")
 
@@ -187,6 +210,43 @@ class GitHubClient(ConnectorClient):
             logger.error(f"Failed to fetch files from {repo}: {e}")
             raise
 
+    async def _get_contents(self, repo: str, path: str) -> Optional[bytes]:
+        """Fetch a file through the contents API, reusing recent results
+
+        A fresh cached copy is returned without a request. A stale one is
+        revalidated with If-None-Match, so an unchanged file costs a 304 with
+        no body instead of a full download. Returns None if the path has no
+        content (e.g. it is a directory).
+        """
+        key = (repo, path)
+        entry = self._content_cache.get(key)
+        if entry is not None and time.monotonic() < entry.expires_at:
+            self._content_cache.move_to_end(key)
+            return entry.content
+
+        headers = {"If-None-Match": entry.etag} if entry and entry.etag else None
+        response = await self.client.get(
+            f"{self.base_url}/repos/{repo}/contents/{path}", headers=headers
+        )
+        if response.status_code == 304 and entry is not None:
+            content = entry.content
+        else:
+            response.raise_for_status()
+            content_data = response.json()
+            if not isinstance(content_data, dict) or "content" not in content_data:
+                return None
+            content = base64.b64decode(content_data["content"].replace("\n", ""))
+
+        self._content_cache[key] = _CachedContent(
+            content=content,
+            etag=response.headers.get("etag") or (entry.etag if entry else None),
+            expires_at=time.monotonic() + CONTENT_CACHE_TTL,
+        )
+        self._content_cache.move_to_end(key)
+        if len(self._content_cache) > CONTENT_CACHE_SIZE:
+            self._content_cache.popitem(last=False)
+        return content
+
     async def estimate_tokens(
         self, repo: str, paths: List[str], ref: str = "HEAD"
     ) -> TokenEstimate:
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from typing import Dict
 
@@ -18,12 +19,16 @@ class ConnectorRegistry:
         cls, connectors: Dict[str, ConnectorsConfig]
     ) -> "ConnectorRegistry":
         registry = cls()
-        for name, cfg in connectors.items():
-            connector = await registry._create_connector(name, cfg)
+        # Each connector verifies its token with a network round-trip; do them
+        # all at once so startup waits for the slowest, not the sum
+        results = await asyncio.gather(
+            *(registry._create_connector(name, cfg) for name, cfg in connectors.items())
+        )
+        for (name, cfg), connector in zip(connectors.items(), results):
             if connector:
                 registry._connectors[name] = connector
-                logger.info(f"Registered connector: {name} ({cfg.type})")
-        logger.info(f"Registered {len(registry._connectors)} connector(s)")
+                logger.info("Registered connector: %s (%s)", name, cfg.type)
+        logger.info("Registered %d connector(s)", len(registry._connectors))
         return registry
 
     async def _create_connector(
@@ -43,9 +48,10 @@ class ConnectorRegistry:
 
         if not await connector.authenticate():
             logger.error(f"Failed to authenticate connector {name} ({cfg.type})")
+            await connector.close()
             return None
 
-        logger.info(f"Successfully authenticated connector {name} ({cfg.type})")
+        logger.info("Successfully authenticated connector %s (%s)", name, cfg.type)
         return connector
 
     def get_connector(self, name: str) -> ConnectorClient | None:
@@ -54,3 +60,9 @@ class ConnectorRegistry:
     def list_connectors(self) -> Dict[str, ConnectorClient]:
         """List all registered connectors."""
         return self._connectors.copy()
+
+    async def close(self) -> None:
+        """Close every registered connector's HTTP client."""
+        await asyncio.gather(
+            *(connector.close() for connector in self._connectors.values())
+        )
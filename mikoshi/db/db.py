@@ -2,11 +2,12 @@ import json
 import os
 import shutil
 import uuid
+from collections import OrderedDict
 from datetime import UTC, datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
-from sqlalchemy import create_engine, func, select, text
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import Row, create_engine, func, insert, select, text, update
+from sqlalchemy.orm import Session, sessionmaker
 
 from mikoshi.db.migrations import run_migrations
 from mikoshi.db.models import (
@@ -19,6 +20,9 @@ from mikoshi.db.models import (
     Workspace,
 )
 
+# Number of chat rows kept in memory by Database.get_chat
+CHAT_CACHE_SIZE = 256
+
 
 class Database:
     def __init__(self, db_path: str):
@@ -26,6 +30,9 @@ class Database:
             f"sqlite:///{db_path}", connect_args={"check_same_thread": False}
         )
         self.SessionLocal = sessionmaker(bind=self.engine)
+        # Detached chat rows by id. Every write to a chat goes through this class,
+        # so entries are refreshed or dropped as part of the write.
+        self._chat_cache: OrderedDict[str, Chat] = OrderedDict()
 
         # Enable foreign keys and WAL mode
         with self.engine.connect() as conn:
@@ -45,8 +52,20 @@ class Database:
             session.add(chat)
             session.commit()
             session.refresh(chat)
+            self._cache_chat(chat)
             return chat
 
+    def _cache_chat(self, chat: Chat) -> None:
+        self._chat_cache[chat.id] = chat
+        self._chat_cache.move_to_end(chat.id)
+        if len(self._chat_cache) > CHAT_CACHE_SIZE:
+            self._chat_cache.popitem(last=False)
+
+    def _touch_cached_chat(self, chat_id: str, updated_at: datetime) -> None:
+        cached = self._chat_cache.get(chat_id)
+        if cached is not None:
+            cached.updated_at = updated_at
+
     def save_message(
         self,
         chat_id: str,
@@ -58,44 +77,121 @@ class Database:
         file_ids: Optional[str] = None,
     ) -> Message:
         with self.SessionLocal() as session:
-            # Get next sequence number for this chat
-            stmt = select(func.coalesce(func.max(Message.sequence), 0) + 1).where(
-                Message.chat_id == chat_id
-            )
-            next_sequence = session.execute(stmt).scalar()
-
-            message = Message(
-                id=str(uuid.uuid4()),
-                chat_id=chat_id,
-                sequence=next_sequence,
-                role=role,
-                content=content,
+            message = self._add_message(
+                session,
+                chat_id,
+                role,
+                content,
                 reasoning_content=reasoning_content,
                 tool_calls=tool_calls,
                 tool_call_id=tool_call_id,
                 file_ids=file_ids,
             )
-            session.add(message)
-
-            # Update chat's updated_at
-            chat = session.get(Chat, chat_id)
-            if chat:
-                chat.updated_at = datetime.now(UTC)
+            session.commit()
+            session.refresh(message)
+            return message
 
+    def save_user_message(
+        self, chat_id: str, content: str, file_ids: List[str]
+    ) -> Message:
+        """Save a user message and mark its files attached in a single transaction"""
+        with self.SessionLocal() as session:
+            message = self._add_message(
+                session,
+                chat_id,
+                "user",
+                content,
+                file_ids=json.dumps(file_ids) if file_ids else None,
+            )
+            if file_ids:
+                session.execute(self._attach_files_stmt(file_ids))
             session.commit()
             session.refresh(message)
             return message
 
-    def get_chat_history(self, chat_id: str) -> List[Message]:
+    def _add_message(
+        self,
+        session: Session,
+        chat_id: str,
+        role: str,
+        content: str,
+        reasoning_content: Optional[str] = None,
+        tool_calls: Optional[str] = None,
+        tool_call_id: Optional[str] = None,
+        file_ids: Optional[str] = None,
+    ) -> Message:
+        # Get next sequence number for this chat
+        stmt = select(func.coalesce(func.max(Message.sequence), 0) + 1).where(
+            Message.chat_id == chat_id
+        )
+        next_sequence = session.execute(stmt).scalar()
+
+        message = Message(
+            id=str(uuid.uuid4()),
+            chat_id=chat_id,
+            sequence=next_sequence,
+            role=role,
+            content=content,
+            reasoning_content=reasoning_content,
+            tool_calls=tool_calls,
+            tool_call_id=tool_call_id,
+            file_ids=file_ids,
+        )
+        session.add(message)
+
+        # Update chat's updated_at
+        chat = session.get(Chat, chat_id)
+        if chat:
+            chat.updated_at = datetime.now(UTC)
+            self._touch_cached_chat(chat_id, chat.updated_at)
+        return message
+
+    def get_chat_history(
+        self, chat_id: str, limit: Optional[int] = None
+    ) -> List[Message]:
         with self.SessionLocal() as session:
             stmt = (
                 select(Message)
                 .where(Message.chat_id == chat_id)
                 .order_by(Message.sequence)
+                .limit(limit)
             )
             result = session.execute(stmt)
             return list(result.scalars().all())
 
+    def iter_chat_history(
+        self,
+        chat_id: str,
+        batch_size: int = 100,
+        after_sequence: Optional[int] = None,
+    ) -> Iterator[Row]:
+        """Stream chat messages in sequence order, fetching rows in batches
+
+        Yields plain rows with the columns needed to rebuild the model context
+        (id, sequence, role, content, tool_calls, tool_call_id, file_ids) rather
+        than ORM objects, which skips identity-map and attribute instrumentation
+        work for every message. If after_sequence is given, only messages with a
+        higher sequence number are returned.
+        """
+        with self.SessionLocal() as session:
+            stmt = (
+                select(
+                    Message.id,
+                    Message.sequence,
+                    Message.role,
+                    Message.content,
+                    Message.tool_calls,
+                    Message.tool_call_id,
+                    Message.file_ids,
+                )
+                .where(Message.chat_id == chat_id)
+                .order_by(Message.sequence)
+                .execution_options(yield_per=batch_size)
+            )
+            if after_sequence is not None:
+                stmt = stmt.where(Message.sequence > after_sequence)
+            yield from session.execute(stmt)
+
     def get_messages_from_sequence(
         self, chat_id: str, from_sequence: int
     ) -> List[Message]:
@@ -110,8 +206,16 @@ class Database:
             return list(result.scalars().all())
 
     def get_chat(self, chat_id: str) -> Optional[Chat]:
+        cached = self._chat_cache.get(chat_id)
+        if cached is not None:
+            self._chat_cache.move_to_end(chat_id)
+            return cached
+
         with self.SessionLocal() as session:
-            return session.get(Chat, chat_id)
+            chat = session.get(Chat, chat_id)
+            if chat:
+                self._cache_chat(chat)
+            return chat
 
     def list_chats(self, limit: int = 20) -> List[Chat]:
         with self.SessionLocal() as session:
@@ -120,6 +224,7 @@ class Database:
             return list(result.scalars().all())
 
     def delete_chat(self, chat_id: str):
+        self._chat_cache.pop(chat_id, None)
         with self.SessionLocal() as session:
             chat = session.get(Chat, chat_id)
             if chat:
@@ -140,6 +245,7 @@ class Database:
             chat.updated_at = datetime.now(UTC)
             session.commit()
             session.refresh(chat)
+            self._cache_chat(chat)
             return chat
 
     def save_chat_config(
@@ -168,25 +274,28 @@ class Database:
 
             session.commit()
             session.refresh(chat)
+            self._cache_chat(chat)
             return chat
 
     def get_chat_config(self, chat_id: str) -> Optional[Dict]:
         """Get chat configuration"""
-        with self.SessionLocal() as session:
-            chat = session.get(Chat, chat_id)
-            if not chat:
-                return None
-
-            return {
-                "model": chat.model,
-                "system_prompt": chat.system_prompt,
-                "tool_servers": json.loads(chat.tool_servers)
-                if chat.tool_servers
-                else [],
-                "model_params": json.loads(chat.model_params)
-                if chat.model_params
-                else None,
-            }
+        chat = self.get_chat(chat_id)
+        if not chat:
+            return None
+
+        return self.chat_config(chat)
+
+    @staticmethod
+    def chat_config(chat: Chat) -> Dict:
+        """Build the configuration dict from an already loaded chat row"""
+        return {
+            "model": chat.model,
+            "system_prompt": chat.system_prompt,
+            "tool_servers": json.loads(chat.tool_servers) if chat.tool_servers else [],
+            "model_params": json.loads(chat.model_params)
+            if chat.model_params
+            else None,
+        }
 
     def get_chat_state(self, chat_id: str) -> Dict:
         with self.SessionLocal() as session:
@@ -239,6 +348,7 @@ class Database:
             chat = session.get(Chat, message.chat_id)
             if chat:
                 chat.updated_at = datetime.now(UTC)
+                self._touch_cached_chat(chat.id, chat.updated_at)
 
             session.commit()
             return True
@@ -303,6 +413,7 @@ class Database:
 
             session.commit()
             session.refresh(new_chat)
+            self._cache_chat(new_chat)
             return new_chat
 
     def create_file(
@@ -327,6 +438,18 @@ class Database:
             session.refresh(file_obj)
             return file_obj
 
+    def create_files(self, files: List[Dict[str, Any]]) -> None:
+        """Insert several pending files in one transaction
+
+        Each dict holds the File columns (id, filename, file_path, content_type,
+        source); the rows are written with a single executemany.
+        """
+        if not files:
+            return
+        with self.SessionLocal() as session:
+            session.execute(insert(File), [{"status": "pending", **f} for f in files])
+            session.commit()
+
     def get_file(self, file_id: str) -> Optional[File]:
         with self.SessionLocal() as session:
             return session.get(File, file_id)
@@ -339,6 +462,25 @@ class Database:
             result = session.execute(stmt)
             return {f.id: f for f in result.scalars().all()}
 
+    def get_chat_files(self, chat_id: str) -> Dict[str, File]:
+        """Get every file attached to a user message in the chat, keyed by id"""
+        with self.SessionLocal() as session:
+            stmt = select(Message.file_ids).where(
+                Message.chat_id == chat_id,
+                Message.role == "user",
+                Message.file_ids.is_not(None),
+            )
+            file_ids: List[str] = []
+            for file_ids_json in session.scalars(stmt):
+                try:
+                    file_ids.extend(json.loads(file_ids_json))
+                except json.JSONDecodeError:
+                    continue
+            if not file_ids:
+                return {}
+            stmt = select(File).where(File.id.in_(file_ids))
+            return {f.id: f for f in session.scalars(stmt)}
+
     def list_pending_files(self) -> List[File]:
         with self.SessionLocal() as session:
             stmt = select(File).where(File.status == "pending")
@@ -349,12 +491,19 @@ class Database:
         if not file_ids:
             return
         with self.SessionLocal() as session:
-            stmt = select(File).where(File.id.in_(file_ids))
-            files = session.execute(stmt).scalars().all()
-            for f in files:
-                f.status = "attached"
+            session.execute(self._attach_files_stmt(file_ids))
             session.commit()
 
+    @staticmethod
+    def _attach_files_stmt(file_ids: List[str]):
+        # A single UPDATE instead of loading each row and flushing it separately
+        return (
+            update(File)
+            .where(File.id.in_(file_ids))
+            .values(status="attached")
+            .execution_options(synchronize_session=False)
+        )
+
     def delete_file(self, file_id: str):
         with self.SessionLocal() as session:
             file_obj = session.get(File, file_id)
@@ -498,6 +647,8 @@ class Database:
             if workspace:
                 session.delete(workspace)
                 session.commit()
+                # Chats pointing at the workspace had workspace_id set to NULL
+                self._chat_cache.clear()
 
     def get_workspace_by_chat(self, chat_id: str) -> Optional[Workspace]:
         with self.SessionLocal() as session:
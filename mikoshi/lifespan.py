@@ -4,17 +4,13 @@ import os
 import shutil
 from contextlib import asynccontextmanager
 
+import httpx
 from fastapi import FastAPI
 
-from mikoshi.agents import AgentManager, AgentRegistry
+from mikoshi.cache import ResponseCache
 from mikoshi.config import AppConfig
-from mikoshi.connectors.registry import ConnectorRegistry
 from mikoshi.db import Database
 from mikoshi.middleware import InFlightRequests
-from mikoshi.providers.registry import ProviderRegistry
-from mikoshi.skills import SkillRegistry
-from mikoshi.tools.manager import ToolManager
-from mikoshi.workspace import WorkspaceService
 
 logger = logging.getLogger(__name__)
 
@@ -37,20 +33,26 @@ async def _orphan_file_cleanup_task(app: FastAPI):
                         shutil.rmtree(upload_dir, ignore_errors=True)
 
                 if deleted_ids:
-                    logger.info(f"Cleaned up {len(deleted_ids)} orphan files")
+                    logger.info("Cleaned up %d orphan files", len(deleted_ids))
             except Exception as e:
-                logger.error(f"Orphan cleanup error: {e}")
+                logger.error("Orphan cleanup error: %s", e)
 
             await asyncio.sleep(3600)
     except asyncio.CancelledError:
         logger.info("Orphan cleanup task cancelled")
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Handle startup and shutdown events"""
-    # Startup: Initialize tool manager and other resources
-    logger.info("Initializing application...")
+async def _deferred_init(app: FastAPI):
+    """Initialize services in the background while the server already accepts connections"""
+    # Service modules pull in the LLM SDKs and MCP client; import them only when
+    # the server actually starts
+    from mikoshi.agents import AgentManager, AgentRegistry
+    from mikoshi.connectors.registry import ConnectorRegistry
+    from mikoshi.providers.registry import ProviderRegistry
+    from mikoshi.skills import SkillRegistry
+    from mikoshi.tools.manager import ToolManager
+    from mikoshi.workspace import WorkspaceService
+
     app_config: AppConfig = app.state.app_config
 
     # Initialize database
@@ -60,26 +62,42 @@ async def lifespan(app: FastAPI):
 
     # Initialize provider registry
     logger.info("Initializing provider registry...")
-    provider_registry = ProviderRegistry(app_config.providers)
+    provider_registry = ProviderRegistry(
+        app_config.providers, app.state.http_client, app_config.llm_max_concurrency
+    )
     app.state.provider_registry = provider_registry
-
-    # Initialize and start tool manager
-    try:
-        tool_manager = ToolManager(
-            app_config.data_dir,
-            app_config.plugins.tools_dir,
-            app_config.mcps,
-            app_config.connectors,
-            app_config.mcp_timeout,
-            database,
-        )
-        await tool_manager.start()
-        app.state.tool_manager = tool_manager
-    except Exception as e:
-        logger.error(f"Failed to start tool manager: {e}", exc_info=True)
-        # Clean up already initialized resources
-        database.close()
-        raise
+    # Provider config is immutable at runtime; only the model lists get refreshed
+    app.state.providers_skeleton = [
+        {"name": name, "api_base": provider.config.api_base, "models": []}
+        for name, provider in provider_registry.iter_providers()
+    ]
+
+    # Start tool manager and connectors concurrently; MCP server startup dominates
+    logger.info("Starting tool manager and connectors...")
+    tool_manager = ToolManager(
+        app_config.data_dir,
+        app_config.plugins.tools_dir,
+        app_config.mcps,
+        app_config.connectors,
+        app_config.mcp_timeout,
+        database,
+    )
+    # Registered before starting so shutdown stops it even if startup fails
+    app.state.tool_manager = tool_manager
+    tools_result, connectors_result = await asyncio.gather(
+        tool_manager.start(),
+        ConnectorRegistry.create(app_config.connectors),
+        return_exceptions=True,
+    )
+    if isinstance(tools_result, BaseException):
+        # The connectors started fine but will never be used; don't leak them
+        if not isinstance(connectors_result, BaseException):
+            await connectors_result.close()
+        raise tools_result
+    if isinstance(connectors_result, BaseException):
+        raise connectors_result
+    connector_registry = connectors_result
+    app.state.connector_registry = connector_registry
 
     # Initialize agent registry
     logger.info("Initializing agent registry...")
@@ -93,10 +111,6 @@ async def lifespan(app: FastAPI):
     skill_registry = SkillRegistry(app_config.plugins.skills_dir)
     app.state.skill_registry = skill_registry
 
-    logger.info("Initializing connectors...")
-    connector_registry = await ConnectorRegistry.create(app_config.connectors)
-    app.state.connector_registry = connector_registry
-
     # Initialize workspace service
     logger.info("Initializing workspace service...")
     workspace_service = WorkspaceService(
@@ -120,14 +134,51 @@ async def lifespan(app: FastAPI):
     )
     app.state.agent_manager = agent_manager
 
-    # Initialize model cache
-    app.state.models_cache = None
-    app.state.models_cache_time = 0.0
+    # Start orphan file cleanup task
+    app.state.cleanup_task = asyncio.create_task(_orphan_file_cleanup_task(app))
 
+    app.state.ready = True
     logger.info("Server started successfully")
 
-    # Start orphan file cleanup task
-    cleanup_task = asyncio.create_task(_orphan_file_cleanup_task(app))
+
+def _on_init_done(app: FastAPI, task: asyncio.Task):
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        logger.error("Application initialization failed: %s", error, exc_info=error)
+        # A server that can never become ready must not look alive: /health/live
+        # now fails, and the host running the server decides whether to stop it
+        app.state.init_error = error
+        on_init_failure = getattr(app.state, "on_init_failure", None)
+        if on_init_failure is not None:
+            on_init_failure()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Handle startup and shutdown events
+
+    Heavy initialization runs in a background task so the server starts listening
+    immediately. API routes answer 503 until app.state.ready is set.
+    """
+    logger.info("Initializing application...")
+    app.state.ready = False
+    app.state.init_error = None
+
+    # Initialize response cache
+    app.state.response_cache = ResponseCache()
+
+    # Shared HTTP client for outbound requests: media endpoints and the LLM SDKs
+    # all draw from one connection pool
+    http_client = httpx.AsyncClient(
+        timeout=300.0,
+        limits=httpx.Limits(max_connections=256, max_keepalive_connections=64),
+    )
+    app.state.http_client = http_client
+
+    init_task = asyncio.create_task(_deferred_init(app))
+    init_task.add_done_callback(lambda task: _on_init_done(app, task))
 
     yield
 
@@ -135,24 +186,57 @@ async def lifespan(app: FastAPI):
     in_flight: InFlightRequests = app.state.in_flight
     await in_flight.drain()
 
+    # Titles are generated after the reply is sent; let them land before the
+    # HTTP client and database they use are closed
+    agent_manager = getattr(app.state, "agent_manager", None)
+    if agent_manager is not None:
+        await agent_manager.drain()
+
+    # Stop initialization if it is still running
+    app.state.ready = False
+    if not init_task.done():
+        init_task.cancel()
+        try:
+            await init_task
+        except (asyncio.CancelledError, Exception):
+            pass
+
     # Cancel background tasks
-    cleanup_task.cancel()
-    try:
-        await cleanup_task
-    except asyncio.CancelledError:
-        pass
+    cleanup_task = getattr(app.state, "cleanup_task", None)
+    if cleanup_task is not None:
+        cleanup_task.cancel()
+        try:
+            await cleanup_task
+        except asyncio.CancelledError:
+            pass
 
     # Shutdown: Clean up resources
     logger.info("Shutting down server...")
 
-    try:
-        await tool_manager.stop()
-    except Exception as e:
-        logger.error(f"Error during tool manager shutdown: {e}", exc_info=True)
+    connector_registry = getattr(app.state, "connector_registry", None)
+    if connector_registry is not None:
+        try:
+            await connector_registry.close()
+        except Exception as e:
+            logger.error(f"Error closing connectors: {e}", exc_info=True)
+
+    tool_manager = getattr(app.state, "tool_manager", None)
+    if tool_manager is not None:
+        try:
+            await tool_manager.stop()
+        except Exception as e:
+            logger.error(f"Error during tool manager shutdown: {e}", exc_info=True)
 
     try:
-        database.close()
+        await http_client.aclose()
     except Exception as e:
-        logger.error(f"Error during database shutdown: {e}", exc_info=True)
+        logger.error(f"Error closing HTTP client: {e}", exc_info=True)
+
+    database = getattr(app.state, "database", None)
+    if database is not None:
+        try:
+            database.close()
+        except Exception as e:
+            logger.error(f"Error during database shutdown: {e}", exc_info=True)
 
     logger.info("Server shutdown complete")
@@ -44,6 +44,17 @@ if __name__ == "__main__":
     configure_logging(app_config.logging)
     app.state.app_config = app_config
 
-    uvicorn.run(
-        app, host=app_config.server.host, port=app_config.server.port, log_config=None
+    server = uvicorn.Server(
+        uvicorn.Config(
+            app,
+            host=app_config.server.host,
+            port=app_config.server.port,
+            log_config=None,
+        )
     )
+    # Standalone, a failed background initialization stops the server and the
+    # process exits non-zero, so a supervisor restarts it
+    app.state.on_init_failure = lambda: setattr(server, "should_exit", True)
+    server.run()
+    if getattr(app.state, "init_error", None) is not None:
+        sys.exit(1)
@@ -31,7 +31,7 @@ class InFlightRequests:
         if self._count == 0:
             return True
 
-        logger.info(f"Waiting for {self._count} in-flight request(s) to complete...")
+        logger.info("Waiting for %d in-flight request(s) to complete...", self._count)
 
         try:
             await asyncio.wait_for(self._drained.wait(), timeout=timeout)
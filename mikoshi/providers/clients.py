@@ -1,8 +1,10 @@
 """Base class and implementations for different LLM API clients."""
 
+import asyncio
 import json
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Sequence
+from contextlib import nullcontext
+from typing import Any, AsyncContextManager, Dict, List, Optional, Sequence
 
 
 class LLMClient(ABC):
@@ -43,13 +45,15 @@ class LLMClient(ABC):
 class OpenAIClient(LLMClient):
     """Client for OpenAI-compatible APIs."""
 
-    def __init__(self, client: Any):
+    def __init__(self, client: Any, semaphore: Optional[asyncio.Semaphore] = None):
         """Initialize with an OpenAI client instance.
 
         Args:
             client: openai.OpenAI instance
+            semaphore: Optional limit on concurrent completions, shared across clients
         """
         self.client = client
+        self._limit: AsyncContextManager = semaphore or nullcontext()
 
     async def get_models(self) -> List[str]:
         """Fetch available model IDs using the async client.
@@ -83,20 +87,31 @@ class OpenAIClient(LLMClient):
         if tools:
             api_params["tools"] = tools
 
-        response = await self.client.chat.completions.create(**api_params)
+        async with self._limit:
+            response = await self.client.chat.completions.create(**api_params)
         return response.model_dump()
 
 
 class AnthropicClient(LLMClient):
     """Client for Anthropic API."""
 
-    def __init__(self, client: Any):
+    def __init__(self, client: Any, semaphore: Optional[asyncio.Semaphore] = None):
         """Initialize with an Anthropic client instance.
 
         Args:
             client: anthropic.Anthropic instance
+            semaphore: Optional limit on concurrent completions, shared across clients
         """
         self.client = client
+        self._limit: AsyncContextManager = semaphore or nullcontext()
+
+    async def get_models(self) -> List[str]:
+        """Fetch available model IDs using the async client.
+
+        Returns:
+            List of model ID strings
+        """
+        return [model.id async for model in self.client.models.list()]
 
     async def chat_completion(
         self,
@@ -213,7 +228,8 @@ class AnthropicClient(LLMClient):
         if anthropic_tools:
             api_params["tools"] = anthropic_tools
 
-        response = await self.client.messages.create(**api_params)
+        async with self._limit:
+            response = await self.client.messages.create(**api_params)
         return self._convert_response_to_openai(response)
 
     def _convert_response_to_openai(self, response: Any) -> Dict[str, Any]:
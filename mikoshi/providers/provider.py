@@ -1,17 +1,31 @@
+import asyncio
+import logging
 from typing import Any, Optional
 
-from anthropic import AsyncAnthropic
-from openai import AsyncOpenAI
+import httpx
 
 from mikoshi.config import ProviderConfig, ProviderType
 from mikoshi.providers.clients import AnthropicClient, LLMClient, OpenAIClient
 
+logger = logging.getLogger(__name__)
+
 
 class Provider:
-    def __init__(self, config: ProviderConfig, name: str):
+    def __init__(
+        self,
+        config: ProviderConfig,
+        name: str,
+        http_client: Optional[httpx.AsyncClient] = None,
+        llm_semaphore: Optional[asyncio.Semaphore] = None,
+    ):
         self.config = config
         self._name = name
+        # Shared connection pool handed to the SDK; each SDK creates its own otherwise
+        self._http_client = http_client
+        self._llm_semaphore = llm_semaphore
         self._llm_client: Optional[LLMClient] = None
+        # Last successfully fetched model list, served if the provider is unreachable
+        self._last_model_ids: Optional[list[str]] = None
 
     def name(self) -> str:
         return self._name
@@ -22,14 +36,21 @@ class Provider:
             kwargs: dict = {"api_key": self.config.api_key or ""}
             if self.config.api_base:
                 kwargs["base_url"] = self.config.api_base
+            if self._http_client is not None:
+                kwargs["http_client"] = self._http_client
 
+            # SDKs are imported on first use; they are slow to import
             if self.config.type == ProviderType.ANTHROPIC:
+                from anthropic import AsyncAnthropic
+
                 native_client = AsyncAnthropic(**kwargs)
-                self._llm_client = AnthropicClient(native_client)
+                self._llm_client = AnthropicClient(native_client, self._llm_semaphore)
 
             else:
+                from openai import AsyncOpenAI
+
                 native_client = AsyncOpenAI(**kwargs)
-                self._llm_client = OpenAIClient(native_client)
+                self._llm_client = OpenAIClient(native_client, self._llm_semaphore)
 
         return self._llm_client
 
@@ -41,7 +62,8 @@ class Provider:
         Otherwise, fetches all models from the provider.
 
         Returns:
-            List of model IDs if successful, None if an error occurs
+            List of model IDs if successful. If the fetch fails, the last
+            successfully fetched list, falling back to the configured model_ids.
         """
         if self.config.model_ids and not self.config.model_filter:
             return self.config.model_ids
@@ -63,12 +85,15 @@ class Provider:
                     ):
                         filtered_ids.append(model_id)
 
-                return filtered_ids
+                model_ids = filtered_ids
 
+            self._last_model_ids = model_ids
             return model_ids
 
-        except Exception as e:
-            print(f"Error fetching models from {self._name}: {e}")
+        except Exception:
+            logger.exception("Error fetching models from %s", self._name)
+            if self._last_model_ids is not None:
+                return self._last_model_ids
             return self.config.model_ids
 
     def _matches_filter(self, model_dict: dict, conditions: list) -> bool:
@@ -1,14 +1,33 @@
-from typing import Dict
+import asyncio
+from typing import Dict, Optional, Tuple
+
+import httpx
 
 from mikoshi.config import ProviderConfig
 from mikoshi.providers import Provider
 
 
 class ProviderRegistry:
-    def __init__(self, providers: Dict[str, ProviderConfig]) -> None:
+    def __init__(
+        self,
+        providers: Dict[str, ProviderConfig],
+        http_client: Optional[httpx.AsyncClient] = None,
+        max_concurrent_completions: Optional[int] = None,
+    ) -> None:
+        # One limit across all providers, so the total number of in-flight
+        # completions stays bounded however the chats are spread out
+        llm_semaphore = (
+            asyncio.Semaphore(max_concurrent_completions)
+            if max_concurrent_completions
+            else None
+        )
         self._providers: Dict[str, Provider] = {}
         for name, cfg in providers.items():
-            self._providers[name] = Provider(cfg, name)
+            self._providers[name] = Provider(cfg, name, http_client, llm_semaphore)
+        # Providers are fixed after construction, so the pairs can be shared
+        self._provider_items: Tuple[Tuple[str, Provider], ...] = tuple(
+            self._providers.items()
+        )
 
     def get_provider(self, name: str) -> Provider | None:
         return self._providers.get(name)
@@ -16,3 +35,7 @@ class ProviderRegistry:
     def list_providers(self) -> Dict[str, Provider]:
         """List all registered providers."""
         return self._providers.copy()
+
+    def iter_providers(self) -> Tuple[Tuple[str, Provider], ...]:
+        """Return (name, provider) pairs without copying the registry."""
+        return self._provider_items
@@ -1,4 +1,4 @@
-from fastapi import FastAPI
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Request
 
 from mikoshi.routes import (
     approvals,
@@ -13,15 +13,22 @@ from mikoshi.routes import (
 )
 
 
+async def require_ready(request: Request) -> None:
+    """Reject API requests until background initialization has finished."""
+    if not getattr(request.app.state, "ready", False):
+        raise HTTPException(status_code=503, detail="Server is starting up")
+
+
 def register_routes(app: FastAPI):
     """Register all API routes with the FastAPI application."""
-    prefix = "/api"
-    app.include_router(approvals.router, prefix=prefix, tags=["approvals"])
-    app.include_router(chats.router, prefix=prefix, tags=["chats"])
-    app.include_router(config.router, prefix=prefix, tags=["config"])
-    app.include_router(connectors.router, prefix=prefix, tags=["connectors"])
-    app.include_router(files.router, prefix=prefix, tags=["files"])
-    app.include_router(media.router, prefix=prefix, tags=["media"])
-    app.include_router(skills.router, prefix=prefix, tags=["skills"])
-    app.include_router(tools.router, prefix=prefix, tags=["tools"])
-    app.include_router(workspaces.router, prefix=prefix, tags=["workspaces"])
+    api = APIRouter(prefix="/api", dependencies=[Depends(require_ready)])
+    api.include_router(approvals.router, tags=["approvals"])
+    api.include_router(chats.router, tags=["chats"])
+    api.include_router(config.router, tags=["config"])
+    api.include_router(connectors.router, tags=["connectors"])
+    api.include_router(files.router, tags=["files"])
+    api.include_router(media.router, tags=["media"])
+    api.include_router(skills.router, tags=["skills"])
+    api.include_router(tools.router, tags=["tools"])
+    api.include_router(workspaces.router, tags=["workspaces"])
+    app.include_router(api)
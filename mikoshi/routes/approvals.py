@@ -1,6 +1,9 @@
+from typing import TYPE_CHECKING
+
 from fastapi import APIRouter, HTTPException, Request
 
-from mikoshi.tools.manager import ToolManager
+if TYPE_CHECKING:
+    from mikoshi.tools.manager import ToolManager
 
 router = APIRouter()
 
@@ -1,16 +1,17 @@
 import asyncio
 import json
-from dataclasses import asdict
-from typing import AsyncGenerator, List, Optional
+from typing import TYPE_CHECKING, AsyncGenerator, List, Optional
 
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from mikoshi.agents.manager import AgentManager
 from mikoshi.agents.streaming import StreamEvent
 from mikoshi.routes.schemas import serialize_chat
 
+if TYPE_CHECKING:
+    from mikoshi.agents.manager import AgentManager
+
 
 async def event_stream(
     task: asyncio.Task, queue: asyncio.Queue
@@ -18,7 +19,9 @@ async def event_stream(
     try:
         while True:
             event: StreamEvent = await queue.get()
-            yield f"data: {json.dumps(asdict(event))}\n\n"
+            # asdict() would deep-copy the payload just to serialize it
+            payload = json.dumps({"type": event.type, "data": event.data})
+            yield f"data: {payload}\n\n"
             if event.type == "done":
                 break
     except GeneratorExit:
@@ -1,10 +1,18 @@
-import time
+import asyncio
+import logging
+from dataclasses import asdict
 
 from fastapi import APIRouter, Request
 
+from mikoshi.cache import CachePolicy, ResponseCache
+
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
-MODELS_CACHE_TTL = 300  # 5 minutes
+# Constant fields of every OpenAI-compatible model entry
+MODEL_OBJECT = "model"
+MODEL_CREATED = 1234567890
 
 
 @router.get("/config/models")
@@ -15,58 +23,54 @@ async def list_models(request: Request):
     Returns both predefined agents from the registry and provider models.
     Format: {agent_name} for predefined agents, {provider}:{model_id} for provider models.
     """
-    current_time = time.time()
-    cache = getattr(request.app.state, "models_cache", None)
-    cache_time = getattr(request.app.state, "models_cache_time", 0.0)
+    cache: ResponseCache = request.app.state.response_cache
+    cached = await cache.get_or_generate_body(
+        "models", CachePolicy.NORMAL, lambda: _build_models(request)
+    )
+    return cached.to_response(request)
 
-    if cache is not None and (current_time - cache_time) < MODELS_CACHE_TTL:
-        return cache
 
+async def _build_models(request: Request) -> dict:
     agent_registry = request.app.state.model_registry
     provider_registry = request.app.state.provider_registry
 
-    models = []
-
     # Add predefined agents from registry
-    agent_names = agent_registry.list_agent_names()
-    for model_name in agent_names:
-        models.append(
-            {
-                "id": model_name,
-                "object": "model",
-                "created": 1234567890,
-                "owned_by": "mikoshi",
-            }
-        )
-
-    # Add provider models
-    for provider_name, provider in provider_registry.list_providers().items():
-        try:
-            model_ids = await provider.get_model_ids()
-            if model_ids:
-                for model_id in model_ids:
-                    models.append(
-                        {
-                            "id": f"{provider_name}:{model_id}",
-                            "object": "model",
-                            "created": 1234567890,
-                            "owned_by": provider_name,
-                        }
-                    )
-        except Exception as e:
+    models = [
+        _model_entry(model_name, "mikoshi")
+        for model_name in agent_registry.list_agent_names()
+    ]
+
+    # Add provider models, querying all providers concurrently
+    providers = provider_registry.iter_providers()
+    results = await asyncio.gather(
+        *(provider.get_model_ids() for _, provider in providers),
+        return_exceptions=True,
+    )
+    for (provider_name, _), model_ids in zip(providers, results):
+        if isinstance(model_ids, Exception):
             # If a provider doesn't support listing models, skip it
-            import traceback
-
-            print(f"Warning: Could not list models from provider {provider_name}: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
+            logger.warning(
+                "Could not list models from provider %s",
+                provider_name,
+                exc_info=model_ids,
+            )
             continue
+        if model_ids:
+            models.extend(
+                _model_entry(f"{provider_name}:{model_id}", provider_name)
+                for model_id in model_ids
+            )
 
-    result = {"object": "list", "data": models}
+    return {"object": "list", "data": models}
 
-    request.app.state.models_cache = result
-    request.app.state.models_cache_time = current_time
 
-    return result
+def _model_entry(model_id: str, owned_by: str) -> dict:
+    return {
+        "id": model_id,
+        "object": MODEL_OBJECT,
+        "created": MODEL_CREATED,
+        "owned_by": owned_by,
+    }
 
 
 @router.get("/config/agents")
@@ -74,28 +78,18 @@ async def list_agents(request: Request):
     """
     List all predefined agents from the registry with their configurations.
     """
-    agent_registry = request.app.state.model_registry
+    cache: ResponseCache = request.app.state.response_cache
+    # Agents are discovered once at startup, so this entry lasts for the
+    # lifetime of the process
+    cached = await cache.get_or_generate_body(
+        "agents", CachePolicy.STATIC, lambda: _build_agents(request)
+    )
+    return cached.to_response(request)
 
-    agents = []
-    agent_names = agent_registry.list_agent_names()
-
-    for model_name in agent_names:
-        agent_cls = agent_registry.get_agent_class(model_name)
-        if agent_cls:
-            agents.append(
-                {
-                    "name": model_name,
-                    "system_prompt": agent_cls.system_prompt,
-                    "provider": agent_cls.provider_id,
-                    "model_id": agent_cls.model_id,
-                    "tool_servers": list(agent_cls.tool_servers),
-                    "temperature": agent_cls.temperature,
-                    "max_tokens": agent_cls.max_tokens,
-                    "max_iterations": agent_cls.max_iterations,
-                }
-            )
 
-    return {"agents": agents}
+async def _build_agents(request: Request) -> dict:
+    agent_registry = request.app.state.model_registry
+    return {"agents": [asdict(d) for d in agent_registry.list_agent_descriptors()]}
 
 
 @router.get("/config/default-chat")
@@ -103,6 +97,14 @@ async def get_default_chat_config(request: Request):
     """
     Get the default agent plugin (the one with default=True).
     """
+    cache: ResponseCache = request.app.state.response_cache
+    cached = await cache.get_or_generate_body(
+        "default-chat", CachePolicy.STATIC, lambda: _build_default_chat_config(request)
+    )
+    return cached.to_response(request)
+
+
+async def _build_default_chat_config(request: Request) -> dict:
     agent_registry = request.app.state.model_registry
     default_name = agent_registry.get_default_agent_name()
     if default_name is None:
@@ -127,23 +129,33 @@ async def list_providers(request: Request):
     """
     List all configured providers with their available models.
     """
+    cache: ResponseCache = request.app.state.response_cache
+    cached = await cache.get_or_generate_body(
+        "providers", CachePolicy.LONG, lambda: _build_providers(request)
+    )
+    return cached.to_response(request)
+
+
+async def _build_providers(request: Request) -> dict:
     provider_registry = request.app.state.provider_registry
 
-    providers = []
-    for provider_name, provider in provider_registry.list_providers().items():
-        try:
-            model_ids = await provider.get_model_ids()
-            if model_ids is None:
-                model_ids = []
-        except Exception:
-            model_ids = []
-
-        providers.append(
-            {
-                "name": provider_name,
-                "api_base": provider.config.api_base,
-                "models": model_ids,
-            }
-        )
+    providers = [dict(entry) for entry in request.app.state.providers_skeleton]
+    results = await asyncio.gather(
+        *(
+            provider.get_model_ids()
+            for _, provider in provider_registry.iter_providers()
+        ),
+        return_exceptions=True,
+    )
+
+    for entry, model_ids in zip(providers, results):
+        if isinstance(model_ids, Exception):
+            logger.warning(
+                "Could not list models from provider %s",
+                entry["name"],
+                exc_info=model_ids,
+            )
+        elif model_ids is not None:
+            entry["models"] = model_ids
 
     return {"providers": providers}
@@ -1,8 +1,10 @@
+import asyncio
 import logging
 import mimetypes
 import os
+import shutil
 import uuid
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
@@ -13,6 +15,13 @@ from mikoshi.routes.schemas import FileResponse
 router = APIRouter(prefix="/connectors")
 logger = logging.getLogger(__name__)
 
+# Upper bound on concurrent tree requests while expanding directories
+MAX_CONCURRENT_TREE_REQUESTS = 10
+# Upper bound on files downloaded at once during an import
+MAX_CONCURRENT_FILE_IMPORTS = 10
+# Imported files written to disk per worker thread call
+WRITE_BATCH_SIZE = 16
+
 
 class EstimateTokensRequest(BaseModel):
     repo: str
@@ -126,7 +135,10 @@ async def estimate_tokens(
 
     try:
         logger.info(
-            f"Estimating tokens for repo={body.repo}, paths={body.paths}, exclude={body.exclude_paths}"
+            "Estimating tokens for repo=%s, paths=%s, exclude=%s",
+            body.repo,
+            body.paths,
+            body.exclude_paths,
         )
 
         all_file_paths = await _expand_paths_to_files(
@@ -134,17 +146,17 @@ async def estimate_tokens(
         )
 
         logger.info(
-            f"Expanded to {len(all_file_paths)} files: {all_file_paths[:10]}..."
+            "Expanded to %d files: %s...", len(all_file_paths), all_file_paths[:10]
         )
 
         if not all_file_paths:
             return {"total_tokens": 0, "files": {}}
 
         estimate = await client.estimate_tokens(body.repo, all_file_paths)
-        logger.info(f"Token estimate: {estimate.total_tokens}")
+        logger.info("Token estimate: %d", estimate.total_tokens)
         return estimate.model_dump()
     except Exception as e:
-        logger.error(f"Failed to estimate tokens: {str(e)}", exc_info=True)
+        logger.error("Failed to estimate tokens: %s", e, exc_info=True)
         raise HTTPException(
             status_code=500, detail=f"Failed to estimate tokens: {str(e)}"
         )
@@ -160,17 +172,74 @@ async def upload_files(request: Request, connector: str, body: FilesRequest):
             client, body.repo, body.paths, body.exclude_paths
         )
     except Exception as e:
-        logger.error(f"Failed to expand repository paths: {e}")
+        logger.error("Failed to expand repository paths: %s", e)
         raise HTTPException(
             status_code=400, detail=f"Failed to expand repository paths: {e}"
         )
 
     db: Database = request.app.state.database
     source_str = f"{client.type}:{body.repo}"
-    result = []
-    for path in file_paths:
-        try:
-            content = await client.get_file_content(body.repo, path)
+    # Download the files concurrently, a bounded number at a time
+    sem = asyncio.Semaphore(MAX_CONCURRENT_FILE_IMPORTS)
+    downloads = {
+        asyncio.create_task(_fetch_file(client, body.repo, path, source_str, sem)): i
+        for i, path in enumerate(file_paths)
+    }
+    rows_by_index: Dict[int, dict] = {}
+    # Upload directories created so far, removed again if the import fails
+    written: List[str] = []
+    try:
+        batch: List[Tuple[str, bytes]] = []
+        pending = set(downloads)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                row, content = task.result()
+                rows_by_index[downloads.pop(task)] = row
+                batch.append((row["file_path"], content))
+            # Write each batch as soon as it is downloaded, one worker thread
+            # hop per batch, so finished files don't wait in memory for the rest
+            if len(batch) >= WRITE_BATCH_SIZE or not pending:
+                await asyncio.to_thread(_write_files, batch, written)
+                batch = []
+
+        rows = [rows_by_index[i] for i in range(len(file_paths))]
+        # One transaction for the whole import instead of a commit per file
+        db.create_files(rows)
+    except Exception as e:
+        # One failure fails the import: stop the remaining downloads and drop
+        # the files already written, which have no rows pointing at them
+        for task in downloads:
+            task.cancel()
+        await asyncio.gather(*downloads, return_exceptions=True)
+        await asyncio.to_thread(_remove_dirs, written)
+        if isinstance(e, HTTPException):
+            raise
+        logger.error("Failed to save repository files: %s", e)
+        raise HTTPException(
+            status_code=500, detail=f"Failed to save repository files: {e}"
+        )
+
+    return [
+        FileResponse(
+            id=row["id"],
+            filename=row["filename"],
+            content_type=row["content_type"],
+            source=row["source"],
+        )
+        for row in rows
+    ]
+
+
+async def _fetch_file(
+    client, repo: str, path: str, source: str, sem: asyncio.Semaphore
+) -> Tuple[dict, bytes]:
+    """Download one repository file, returning its File row values and content."""
+    try:
+        async with sem:
+            content = await client.get_file_content(repo, path)
             filename = os.path.basename(path)
 
             content_type, _ = mimetypes.guess_type(filename)
@@ -178,42 +247,39 @@ async def upload_files(request: Request, connector: str, body: FilesRequest):
                 content_type = "text/plain"
 
             file_id = str(uuid.uuid4())
-            upload_dir = os.path.join("uploads", file_id)
-            os.makedirs(upload_dir, exist_ok=True)
-
-            file_path = os.path.join(upload_dir, filename)
-
-            with open(file_path, "wb") as f:
-                if isinstance(content, str):
-                    f.write(content.encode("utf-8"))
-                else:
-                    f.write(content)
-
-            file_obj = db.create_file(
-                filename=filename,
-                file_path=os.path.abspath(file_path),
-                content_type=content_type,
-                file_id=file_id,
-                source=source_str,
-            )
+            file_path = os.path.join("uploads", file_id, filename)
+            if isinstance(content, str):
+                content = content.encode("utf-8")
+    except Exception as e:
+        logger.error("Failed to download repository file %s: %s", path, e)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to download repository file {path}: {e}",
+        )
 
-            result.append(
-                FileResponse(
-                    id=file_obj.id,
-                    filename=file_obj.filename,
-                    content_type=file_obj.content_type,
-                    source=file_obj.source,
-                )
-            )
+    row = {
+        "id": file_id,
+        "filename": filename,
+        "file_path": os.path.abspath(file_path),
+        "content_type": content_type,
+        "source": source,
+    }
+    return row, content
+
+
+def _write_files(files: List[Tuple[str, bytes]], written: List[str]) -> None:
+    """Write files to disk, recording each directory created in written."""
+    for file_path, content in files:
+        upload_dir = os.path.dirname(file_path)
+        os.makedirs(upload_dir, exist_ok=True)
+        written.append(upload_dir)
+        with open(file_path, "wb") as f:
+            f.write(content)
 
-        except Exception as e:
-            logger.error(f"Failed to download and save repository file {path}: {e}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to download repository file {path}: {e}",
-            )
 
-    return result
+def _remove_dirs(dirs: List[str]) -> None:
+    for upload_dir in dirs:
+        shutil.rmtree(upload_dir, ignore_errors=True)
 
 
 async def _expand_paths_to_files(
@@ -221,53 +287,100 @@ async def _expand_paths_to_files(
 ) -> List[str]:
     """Expand paths (which may include directories) to a list of file paths."""
     exclude_set = set(exclude_paths)
-    all_files = []
 
+    # One listing of the whole repository replaces a request per directory
+    try:
+        all_files = await client.list_all_files(repo)
+    except Exception as e:
+        logger.warning("Failed to list repository files, walking the tree: %s", e)
+        all_files = None
+    if all_files is not None:
+        return _select_files(all_files, paths, exclude_set)
+
+    # Directories are listed concurrently, up to this many requests at a time
+    sem = asyncio.Semaphore(MAX_CONCURRENT_TREE_REQUESTS)
+    results = await asyncio.gather(
+        *(
+            _expand_path(client, repo, path, exclude_set, sem)
+            for path in paths
+            if path not in exclude_set
+        )
+    )
+    return [file_path for files in results for file_path in files]
+
+
+def _select_files(
+    all_files: List[str], paths: List[str], exclude_set: set
+) -> List[str]:
+    """Pick the files at or under each of paths, skipping excluded subtrees."""
+
+    def excluded(file_path: str) -> bool:
+        # A file is excluded if it or any directory above it is
+        if file_path in exclude_set:
+            return True
+        sep = file_path.find("/")
+        while sep != -1:
+            if file_path[:sep] in exclude_set:
+                return True
+            sep = file_path.find("/", sep + 1)
+        return False
+
+    candidates = [f for f in all_files if not excluded(f)]
+    file_set = set(candidates)
+    selected = []
     for path in paths:
         if path in exclude_set:
             continue
+        if path in file_set:
+            selected.append(path)
+            continue
+        prefix = path.strip("/") + "/" if path.strip("/") else ""
+        selected.extend(f for f in candidates if f.startswith(prefix))
+    return selected
 
-        try:
-            logger.debug(f"Processing path: '{path}'")
+
+async def _expand_path(
+    client, repo: str, path: str, exclude_set: set, sem: asyncio.Semaphore
+) -> List[str]:
+    try:
+        logger.debug("Processing path: '%s'", path)
+        async with sem:
             tree_node = await client.browse_tree(repo, path)
-            logger.debug(f"Path '{path}' type: {tree_node.type}")
-
-            if tree_node.type == "file":
-                all_files.append(path)
-            else:
-                files_in_dir = await _get_all_files_in_dir(
-                    client, repo, tree_node, exclude_set
-                )
-                logger.debug(f"Found {len(files_in_dir)} files in directory '{path}'")
-                all_files.extend(files_in_dir)
-        except Exception as e:
-            logger.error(f"Failed to process path '{path}': {str(e)}")
-            continue
+        logger.debug("Path '%s' type: %s", path, tree_node.type)
 
-    return all_files
+        if tree_node.type == "file":
+            return [path]
 
+        files_in_dir = await _get_all_files_in_dir(
+            client, repo, tree_node, exclude_set, sem
+        )
+        logger.debug("Found %d files in directory '%s'", len(files_in_dir), path)
+        return files_in_dir
+    except Exception as e:
+        logger.error("Failed to process path '%s': %s", path, e)
+        return []
 
-async def _get_all_files_in_dir(client, repo: str, node, exclude_set: set) -> List[str]:
-    """Recursively get all file paths in a directory."""
-    files = []
 
-    if not node.children:
-        return files
+async def _get_all_files_in_dir(
+    client, repo: str, node, exclude_set: set, sem: asyncio.Semaphore
+) -> List[str]:
+    """Recursively get all file paths in a directory.
 
-    for child in node.children:
-        if child.path in exclude_set:
-            continue
+    Subdirectories are listed concurrently, bounded by sem; the result keeps
+    the listing order.
+    """
 
+    async def expand(child) -> List[str]:
+        if child.path in exclude_set:
+            return []
         if child.type == "file":
-            files.append(child.path)
-        else:
-            try:
+            return [child.path]
+        try:
+            async with sem:
                 subtree = await client.browse_tree(repo, child.path)
-                subfiles = await _get_all_files_in_dir(
-                    client, repo, subtree, exclude_set
-                )
-                files.extend(subfiles)
-            except Exception:
-                continue
-
-    return files
+        except Exception:
+            return []
+        return await _get_all_files_in_dir(client, repo, subtree, exclude_set, sem)
+
+    results = await asyncio.gather(*(expand(child) for child in node.children or []))
+    return [file_path for files in results for file_path in files]
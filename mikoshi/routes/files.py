@@ -1,11 +1,14 @@
+import asyncio
 import logging
 import mimetypes
 import os
+import shutil
 import uuid
-from typing import List
+from typing import BinaryIO, List
 
 from fastapi import APIRouter, HTTPException, Request, UploadFile
 
+from mikoshi.config import AppConfig
 from mikoshi.db.db import Database
 from mikoshi.routes.schemas import FileResponse
 
@@ -13,46 +16,92 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLargeError(Exception):
+    pass
+
+
+def _save_upload(src: BinaryIO, file_path: str, max_bytes: int) -> None:
+    """Copy an upload to disk in chunks, giving up once it exceeds max_bytes"""
+    written = 0
+    with open(file_path, "wb") as dst:
+        while chunk := src.read(COPY_CHUNK_SIZE):
+            written += len(chunk)
+            if written > max_bytes:
+                raise UploadTooLargeError()
+            dst.write(chunk)
+
 
 @router.post("/files", response_model=List[FileResponse])
 async def upload_files(request: Request, files: List[UploadFile]):
     """Upload files via multipart form data."""
     db: Database = request.app.state.database
-    result = []
-
-    for upload in files:
-        file_id = str(uuid.uuid4())
-        upload_dir = os.path.join("uploads", file_id)
-        os.makedirs(upload_dir, exist_ok=True)
-
-        filename = upload.filename or file_id
-        file_path = os.path.join(upload_dir, filename)
-
-        content = await upload.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
+    app_config: AppConfig = request.app.state.app_config
+    max_bytes = app_config.max_upload_mb * 1024 * 1024
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"File exceeds the {app_config.max_upload_mb} MB upload limit",
+    )
+    if any(upload.size is not None and upload.size > max_bytes for upload in files):
+        raise too_large
 
-        content_type = (
-            upload.content_type
-            or mimetypes.guess_type(filename)[0]
-            or "application/octet-stream"
-        )
+    upload_dirs = []
+    rows = []
+    result = []
 
-        file_obj = db.create_file(
-            filename=filename,
-            file_path=os.path.abspath(file_path),
-            content_type=content_type,
-            file_id=file_id,
-            source="upload",
-        )
+    try:
+        for upload in files:
+            file_id = str(uuid.uuid4())
+            upload_dir = os.path.join("uploads", file_id)
+            upload_dirs.append(upload_dir)
+            os.makedirs(upload_dir, exist_ok=True)
+
+            filename = upload.filename or file_id
+            file_path = os.path.join(upload_dir, filename)
+
+            # Stream the spooled upload to disk in a worker thread instead of
+            # reading it into memory and writing it from the event loop
+            await upload.seek(0)
+            await asyncio.to_thread(_save_upload, upload.file, file_path, max_bytes)
+
+            content_type = (
+                upload.content_type
+                or mimetypes.guess_type(filename)[0]
+                or "application/octet-stream"
+            )
 
-        result.append(
-            FileResponse(
-                id=file_obj.id,
-                filename=file_obj.filename,
-                content_type=file_obj.content_type,
-                source=file_obj.source,
+            rows.append(
+                {
+                    "id": file_id,
+                    "filename": filename,
+                    "file_path": os.path.abspath(file_path),
+                    "content_type": content_type,
+                    "source": "upload",
+                }
+            )
+            result.append(
+                FileResponse(
+                    id=file_id,
+                    filename=filename,
+                    content_type=content_type,
+                    source="upload",
+                )
             )
+
+        # Register the whole batch in one transaction instead of a commit per file
+        db.create_files(rows)
+    except Exception as e:
+        # Nothing is registered until every file is on disk and has its row;
+        # drop them all
+        for saved_dir in upload_dirs:
+            shutil.rmtree(saved_dir, ignore_errors=True)
+        if isinstance(e, UploadTooLargeError):
+            raise too_large
+        logger.error("Failed to save uploaded files: %s", e)
+        raise HTTPException(
+            status_code=500, detail=f"Failed to save uploaded files: {e}"
         )
 
     return result
@@ -74,8 +123,6 @@ async def get_file(request: Request, file_id: str):
 @router.delete("/files/{file_id}")
 async def delete_file(request: Request, file_id: str):
     """Delete a pending file."""
-    import shutil
-
     db: Database = request.app.state.database
     file_obj = db.get_file(file_id)
     if not file_obj:
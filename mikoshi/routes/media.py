@@ -1,6 +1,3 @@
-import os
-import tempfile
-
 import httpx
 from fastapi import APIRouter, File, HTTPException, Request, UploadFile
 from fastapi.responses import Response
@@ -22,73 +19,51 @@ async def transcribe_audio(request: Request, file: UploadFile = File(...)):
             detail="Transcription service not configured. Please set audio.transcription.base_url in config.yaml",
         )
 
-    # Read the audio file
+    # Stream the upload's spooled file straight into the multipart body
     try:
-        audio_content = await file.read()
+        await file.seek(0)
     except Exception as e:
         raise HTTPException(
             status_code=400, detail=f"Failed to read audio file: {str(e)}"
         )
 
-    # Save to temporary file (required for multipart upload)
-    temp_file = None
+    files = {"file": (file.filename, file.file, file.content_type)}
+
+    data = {
+        "model": transcription_cfg.model,
+    }
+    headers = {}
+    if transcription_cfg.api_key:
+        headers["Authorization"] = f"Bearer {transcription_cfg.api_key}"
+
+    # Make request to the transcription service
+    client: httpx.AsyncClient = request.app.state.http_client
     try:
-        # Create temporary file with original filename extension
-        file_ext = os.path.splitext(file.filename)[1] if file.filename else ""
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=file_ext)
-        temp_file.write(audio_content)
-        temp_file.close()
-
-        files = {"file": (file.filename, open(temp_file.name, "rb"), file.content_type)}
-
-        data = {
-            "model": transcription_cfg.model,
-        }
-        headers = {}
-        if transcription_cfg.api_key:
-            headers["Authorization"] = f"Bearer {transcription_cfg.api_key}"
-
-        # Make request to the transcription service
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{transcription_cfg.base_url}/v1/audio/transcriptions",
-                    files=files,
-                    data=data,
-                    headers=headers,
-                    timeout=300.0,
-                )
-
-                # Close the file handle
-                files["file"][1].close()
-
-                # Check response status
-                if response.status_code != 200:
-                    raise HTTPException(
-                        status_code=response.status_code,
-                        detail=f"Transcription service error: {response.text}",
-                    )
-
-                # Return the transcription result
-                return response.json()
-
-            except httpx.TimeoutException:
-                raise HTTPException(
-                    status_code=504, detail="Transcription service timeout"
-                )
-            except httpx.RequestError as e:
-                raise HTTPException(
-                    status_code=502,
-                    detail=f"Failed to connect to transcription service: {str(e)}",
-                )
-
-    finally:
-        # Clean up temporary file
-        if temp_file and os.path.exists(temp_file.name):
-            try:
-                os.unlink(temp_file.name)
-            except Exception:
-                pass
+        response = await client.post(
+            f"{transcription_cfg.base_url}/v1/audio/transcriptions",
+            files=files,
+            data=data,
+            headers=headers,
+            timeout=300.0,
+        )
+
+        # Check response status
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Transcription service error: {response.text}",
+            )
+
+        # Return the transcription result
+        return response.json()
+
+    except httpx.TimeoutException:
+        raise HTTPException(status_code=504, detail="Transcription service timeout")
+    except httpx.RequestError as e:
+        raise HTTPException(
+            status_code=502,
+            detail=f"Failed to connect to transcription service: {str(e)}",
+        )
 
 
 @router.post("/media/speech")
@@ -115,30 +90,30 @@ async def generate_speech(request: Request, body: dict):
     if tts_cfg.api_key:
         headers["Authorization"] = f"Bearer {tts_cfg.api_key}"
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{tts_cfg.base_url}/v1/audio/speech",
-                json=payload,
-                headers=headers,
-                timeout=60.0,
-            )
-
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"TTS service error: {response.text}",
-                )
-
-            return Response(
-                content=response.content,
-                media_type=f"audio/{tts_cfg.response_format or 'wav'}",
-            )
+    client: httpx.AsyncClient = request.app.state.http_client
+    try:
+        response = await client.post(
+            f"{tts_cfg.base_url}/v1/audio/speech",
+            json=payload,
+            headers=headers,
+            timeout=60.0,
+        )
 
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="TTS service timeout")
-        except httpx.RequestError as e:
+        if response.status_code != 200:
             raise HTTPException(
-                status_code=502,
-                detail=f"Failed to connect to TTS service: {str(e)}",
+                status_code=response.status_code,
+                detail=f"TTS service error: {response.text}",
             )
+
+        return Response(
+            content=response.content,
+            media_type=f"audio/{tts_cfg.response_format or 'wav'}",
+        )
+
+    except httpx.TimeoutException:
+        raise HTTPException(status_code=504, detail="TTS service timeout")
+    except httpx.RequestError as e:
+        raise HTTPException(
+            status_code=502,
+            detail=f"Failed to connect to TTS service: {str(e)}",
+        )
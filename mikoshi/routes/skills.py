@@ -23,7 +23,7 @@ async def list_skills(request: Request) -> Dict[str, List[Dict]]:
         skills = skill_registry.list_skills()
         return {"skills": skills}
     except Exception as e:
-        logger.error(f"Error listing skills: {e}", exc_info=True)
+        logger.error("Error listing skills: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to list skills: {str(e)}")
 
 
@@ -58,5 +58,5 @@ async def get_skill(skill_name: str, request: Request) -> Dict:
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting skill {skill_name}: {e}", exc_info=True)
+        logger.error("Error getting skill %s: %s", skill_name, e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to get skill: {str(e)}")
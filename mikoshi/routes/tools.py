@@ -1,5 +1,8 @@
 from fastapi import APIRouter, Request
 
+from mikoshi.cache import CachePolicy, ResponseCache
+from mikoshi.tools.handler_base import tool_to_dict
+
 router = APIRouter()
 
 
@@ -8,35 +11,19 @@ async def list_tools(request: Request):
     """
     List all available tool servers and their tools.
     """
-    tool_manager = request.app.state.tool_manager
-
-    tool_servers = []
-    server_names = await tool_manager.list_tool_servers()
+    cache: ResponseCache = request.app.state.response_cache
+    cached = await cache.get_or_generate_body(
+        "tools", CachePolicy.SHORT, lambda: _build_tool_servers(request)
+    )
+    return cached.to_response(request)
 
-    for server_name in server_names:
-        try:
-            tools = await tool_manager.list_tools(server_name)
 
-            # Convert tools to dict format
-            tool_list = []
-            for tool in tools:
-                if hasattr(tool, "parameters"):
-                    tool_dict = {
-                        "name": tool.name,
-                        "description": tool.description,
-                        "parameters": tool.parameters,
-                    }
-                else:
-                    tool_dict = {
-                        "name": getattr(tool, "name", "unknown"),
-                        "description": getattr(tool, "description", ""),
-                        "parameters": {},
-                    }
-                tool_list.append(tool_dict)
-
-            tool_servers.append({"name": server_name, "tools": tool_list})
-        except Exception as e:
-            print(f"Warning: Could not list tools from server {server_name}: {e}")
-            continue
-
-    return {"tool_servers": tool_servers}
+async def _build_tool_servers(request: Request) -> dict:
+    tool_manager = request.app.state.tool_manager
+    all_tools = await tool_manager.list_all_tools()
+    return {
+        "tool_servers": [
+            {"name": server_name, "tools": [tool_to_dict(tool) for tool in tools]}
+            for server_name, tools in all_tools.items()
+        ]
+    }
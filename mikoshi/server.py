@@ -2,6 +2,7 @@ import logging
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from mikoshi.lifespan import lifespan
 from mikoshi.middleware import InFlightMiddleware, InFlightRequests
@@ -38,5 +39,23 @@ async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/health/live")
+async def health_live():
+    """Liveness: the process is up and initialization has not failed."""
+    if getattr(app.state, "init_error", None) is not None:
+        return JSONResponse(status_code=503, content={"status": "failed"})
+    return {"status": "ok"}
+
+
+@app.get("/health/ready")
+async def health_ready():
+    """Readiness: background initialization has completed."""
+    if getattr(app.state, "init_error", None) is not None:
+        return JSONResponse(status_code=503, content={"status": "failed"})
+    if not getattr(app.state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    return {"status": "ok"}
+
+
 # Serve static files from the web UI build (production)
 setup_webui(app)
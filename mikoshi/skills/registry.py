@@ -119,9 +119,9 @@ class SkillRegistry:
                 skill_name = skill_dir.name
                 skill = Skill(name=skill_name, path=skill_dir)
                 self._skills[skill_name] = skill
-                logger.info(f"Discovered skill: {skill_name}")
+                logger.info("Discovered skill: %s", skill_name)
 
-        logger.info(f"Discovered {len(self._skills)} skill(s)")
+        logger.info("Discovered %d skill(s)", len(self._skills))
 
     def list_skills(self) -> List[Dict[str, Any]]:
         """List all available skills."""
@@ -1,8 +1,24 @@
-from .context import ToolCallContext
-from .handler_base import ToolHandler
-from .manager import ToolManager
-from .mcp_handler import MCPToolHandler
-from .toolset_handler import ToolDefinition, ToolSetHandler, tool
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .context import ToolCallContext
+    from .handler_base import ToolHandler
+    from .manager import ToolManager
+    from .mcp_handler import MCPToolHandler
+    from .toolset_handler import ToolDefinition, ToolSetHandler, tool
+
+# Public names are imported on first access (PEP 562), so importing a light
+# submodule doesn't pull in every dependency of the package.
+_LAZY_IMPORTS = {
+    "ToolCallContext": ".context",
+    "ToolHandler": ".handler_base",
+    "ToolManager": ".manager",
+    "MCPToolHandler": ".mcp_handler",
+    "ToolDefinition": ".toolset_handler",
+    "ToolSetHandler": ".toolset_handler",
+    "tool": ".toolset_handler",
+}
 
 __all__ = [
     "ToolCallContext",
@@ -13,3 +29,12 @@ __all__ = [
     "tool",
     "ToolHandler",
 ]
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
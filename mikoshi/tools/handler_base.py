@@ -4,6 +4,20 @@ from typing import Any
 from mikoshi.tools.context import ToolCallContext
 
 
+def tool_to_dict(tool: Any) -> dict:
+    """Normalize a tool from any handler into a name/description/parameters dict.
+
+    Toolset tools expose `parameters`, MCP tools expose `inputSchema`.
+    """
+    return {
+        "name": getattr(tool, "name", "unknown"),
+        "description": getattr(tool, "description", None) or "",
+        "parameters": getattr(tool, "parameters", None)
+        or getattr(tool, "inputSchema", None)
+        or {},
+    }
+
+
 class ToolHandler(ABC):
     """Base handler for a type of tool"""
 
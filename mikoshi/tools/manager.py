@@ -2,7 +2,8 @@ import asyncio
 import importlib.util
 import inspect
 import logging
-from contextlib import AsyncExitStack
+import os
+import time
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -18,6 +19,12 @@ from mikoshi.tools.workspace import WorkspaceToolSetHandler
 
 logger = logging.getLogger(__name__)
 
+# How long an aggregated listing from list_all_tools() is reused
+ALL_TOOLS_TTL = 10.0
+
+# Upper bound on MCP server processes being spawned at the same time
+MAX_CONCURRENT_MCP_STARTS = 8
+
 
 class ToolManager:
     def __init__(
@@ -34,15 +41,19 @@ class ToolManager:
         self._tools_dir = tools_dir
         self._db = db
         self.mcp_timeout = mcp_timeout
-        self.mcp_exit_stack = AsyncExitStack()
         self._pending_approvals: Dict[str, PendingApproval] = {}
         self._connectors_config = connectors_config
+        # Last successful tool listing per server, served if a server fails to respond
+        self._last_tools: Dict[str, list] = {}
+        self._all_tools: Optional[Dict[str, list]] = None
+        self._all_tools_expires_at = 0.0
+        self._all_tools_lock = asyncio.Lock()
+        # In-flight list_tools calls, shared by concurrent callers for the same server
+        self._list_tools_inflight: Dict[str, asyncio.Future] = {}
 
         self._mcp_handlers: Dict[str, MCPToolHandler] = {}
         for server_name, config in servers.items():
-            mcp_handler = MCPToolHandler(
-                server_name, config, mcp_timeout, self.mcp_exit_stack
-            )
+            mcp_handler = MCPToolHandler(server_name, config, mcp_timeout)
             self._mcp_handlers[server_name] = mcp_handler
 
         self._toolset_handlers: Dict[
@@ -87,7 +98,7 @@ class ToolManager:
 
                     seen_classes.add(obj)
                     logger.info(
-                        f"Discovered toolset plugin: {name} from {py_file.name}"
+                        "Discovered toolset plugin: %s from %s", name, py_file.name
                     )
                     plugins[name] = obj
 
@@ -107,16 +118,21 @@ class ToolManager:
         """Initialize all handlers"""
         logger.info("Starting ToolManager...")
 
-        # Initialize MCPs
-        for mcp_handler in self._mcp_handlers.values():
-            try:
-                await mcp_handler.initialize()
+        # Initialize MCPs concurrently; each one spawns a server process and
+        # waits for its handshake, so startup takes about as long as the slowest
+        semaphore = asyncio.Semaphore(
+            min(MAX_CONCURRENT_MCP_STARTS, os.cpu_count() or 1)
+        )
+        started = await asyncio.gather(
+            *(
+                self._start_mcp_handler(mcp_handler, semaphore)
+                for mcp_handler in self._mcp_handlers.values()
+            )
+        )
+        # Register in config order rather than completion order
+        for mcp_handler, ok in zip(self._mcp_handlers.values(), started):
+            if ok:
                 self._server_map[mcp_handler.server_name] = mcp_handler
-            except Exception as e:
-                logger.error(
-                    f"Error initializing MCP handler for server '{mcp_handler.server_name}': {e}",
-                    exc_info=True,
-                )
 
         # Discover and initialize toolset plugins
         plugin_classes = self._discover_toolset_plugins()
@@ -135,7 +151,9 @@ class ToolManager:
                 self._server_map[plugin_instance.server_name] = plugin_instance
 
                 logger.info(
-                    f"Successfully initialized toolset plugin '{class_name}' as '{plugin_instance.server_name}'"
+                    "Successfully initialized toolset plugin '%s' as '%s'",
+                    class_name,
+                    plugin_instance.server_name,
                 )
             except Exception as e:
                 logger.error(
@@ -156,6 +174,26 @@ class ToolManager:
 
         logger.info("ToolManager initialization completed successfully")
 
+    async def _start_mcp_handler(
+        self, mcp_handler: MCPToolHandler, semaphore: asyncio.Semaphore
+    ) -> bool:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await mcp_handler.initialize()
+            except Exception as e:
+                logger.error(
+                    f"Error initializing MCP handler for server '{mcp_handler.server_name}': {e}",
+                    exc_info=True,
+                )
+                return False
+            logger.info(
+                "MCP server '%s' started in %.2fs",
+                mcp_handler.server_name,
+                time.perf_counter() - start,
+            )
+            return True
+
     async def call_tool(
         self,
         call_name: str,
@@ -184,12 +222,76 @@ class ToolManager:
 
     async def list_tools(self, server_name: str) -> list:
         """List available tools from a specific server"""
-        if server_name in self._server_map:
-            return await self._server_map[server_name].list_tools()
-        else:
+        if server_name not in self._server_map:
             logger.error(f"Server '{server_name}' not found in registry")
             raise ValueError(f"Unknown server '{server_name}'")
 
+        # Coalesce concurrent listings of the same server into one request. Each
+        # server has its own entry, so a stuck server doesn't hold up the others.
+        inflight = self._list_tools_inflight.get(server_name)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._fetch_tools(server_name))
+            self._list_tools_inflight[server_name] = inflight
+            inflight.add_done_callback(
+                lambda _: self._list_tools_inflight.pop(server_name, None)
+            )
+        return await asyncio.shield(inflight)
+
+    async def _fetch_tools(self, server_name: str) -> list:
+        try:
+            tools = await self._server_map[server_name].list_tools()
+        except Exception as e:
+            if server_name not in self._last_tools:
+                raise
+            logger.warning(
+                f"Listing tools from '{server_name}' failed, using last known tools: {e}"
+            )
+            return self._last_tools[server_name]
+
+        self._last_tools[server_name] = tools
+        return tools
+
+    async def list_all_tools(self) -> Dict[str, list]:
+        """List tools from every registered server, keyed by server name.
+
+        Servers are queried concurrently and the aggregated result is reused for
+        ALL_TOOLS_TTL seconds. Servers that fail to list are left out.
+        """
+        if (
+            self._all_tools is not None
+            and time.monotonic() < self._all_tools_expires_at
+        ):
+            return self._all_tools
+
+        async with self._all_tools_lock:
+            # Another caller may have refreshed the listing while we waited
+            if (
+                self._all_tools is not None
+                and time.monotonic() < self._all_tools_expires_at
+            ):
+                return self._all_tools
+            return await self._gather_all_tools()
+
+    async def _gather_all_tools(self) -> Dict[str, list]:
+        server_names = list(self._server_map.keys())
+        results = await asyncio.gather(
+            *(self.list_tools(server_name) for server_name in server_names),
+            return_exceptions=True,
+        )
+
+        all_tools = {}
+        for server_name, tools in zip(server_names, results):
+            if isinstance(tools, Exception):
+                logger.warning(
+                    f"Could not list tools from server {server_name}: {tools}"
+                )
+                continue
+            all_tools[server_name] = tools
+
+        self._all_tools = all_tools
+        self._all_tools_expires_at = time.monotonic() + ALL_TOOLS_TTL
+        return all_tools
+
     async def list_tool_servers(self) -> list[str]:
         """List all registered tool servers"""
         return list(self._server_map.keys())
@@ -294,19 +396,7 @@ class ToolManager:
                     exc_info=True,
                 )
 
-        # 2. Close the exit stack for MCP handlers
-        try:
-            logger.debug("Closing shared AsyncExitStack for all MCP handlers...")
-            await asyncio.wait_for(
-                self.mcp_exit_stack.aclose(), timeout=self.mcp_timeout
-            )
-            logger.info("Successfully closed all MCP connections")
-        except asyncio.TimeoutError:
-            logger.error("Timeout closing MCP connections")
-        except Exception as e:
-            logger.error(f"Error closing MCP connections: {e}", exc_info=True)
-
-        # 3. Call cleanup on individual handlers (they just clear their references)
+        # 2. Close MCP connections; each handler stops its own connection task
         for server_name, handler in list(self._mcp_handlers.items()):
             try:
                 await handler.cleanup()
@@ -318,6 +408,8 @@ class ToolManager:
 
         # Clear all references
         self._server_map.clear()
+        self._last_tools.clear()
+        self._all_tools = None
         self._mcp_handlers.clear()
         self._toolset_handlers.clear()
 
@@ -60,30 +60,40 @@ def _extract_mcp_result(result: Any) -> Any:
 
 
 class MCPToolHandler(ToolHandler):
-    """Handles a single MCP server connection and tool calls"""
+    """Handles a single MCP server connection and tool calls
+
+    The stdio client and session contexts are entered and exited by a runner task
+    owned by the handler, since anyio requires both to happen in the same task.
+    This lets initialize() and cleanup() be awaited from any task.
+    """
 
     def __init__(
         self,
         server_name: str,
         config: MCPConfig,
         timeout: int,
-        exit_stack: AsyncExitStack,
     ):
         self.server_name = server_name
         self._config = config
         self._timeout = timeout
-        self._exit_stack = exit_stack
         self._session: Optional[ClientSession] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._stop_event: Optional[asyncio.Event] = None
 
     async def initialize(self):
         """Connect to the MCP server and register its tools"""
-        logger.info(f"Starting MCPToolHandler with server '{self.server_name}'")
+        logger.info("Starting MCPToolHandler with server '%s'", self.server_name)
 
         logger.info(
-            f"Initializing MCP server '{self.server_name}' (type: {self._config.type})"
+            "Initializing MCP server '%s' (type: %s)",
+            self.server_name,
+            self._config.type,
         )
         logger.debug(
-            f"Server '{self.server_name}' - Command: {self._config.command}, Args: {self._config.args}"
+            "Server '%s' - Command: %s, Args: %s",
+            self.server_name,
+            self._config.command,
+            self._config.args,
         )
         if self._config.type == MCPType.STDIO:
             server_params = StdioServerParameters(
@@ -94,35 +104,88 @@ class MCPToolHandler(ToolHandler):
         else:
             raise ValueError(f"Unsupported MCP type: {self._config.type}")
 
-        logger.debug(f"Creating stdio client for '{self.server_name}'...")
-        read_stream, write_stream = await asyncio.wait_for(
-            self._exit_stack.enter_async_context(stdio_client(server_params)),
-            timeout=self._timeout,
+        ready: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._stop_event = asyncio.Event()
+        self._runner = asyncio.create_task(
+            self._run(server_params, ready), name=f"mcp-{self.server_name}"
         )
+        try:
+            session = await ready
+        except BaseException:
+            await self._stop_runner()
+            raise
 
-        logger.debug(
-            f"Connected to stdio client for '{self.server_name}', creating session..."
-        )
-        session = ClientSession(read_stream, write_stream)
-        await asyncio.wait_for(
-            self._exit_stack.enter_async_context(session), timeout=self._timeout
-        )
-
-        logger.debug(f"Initializing session for '{self.server_name}'...")
-        await asyncio.wait_for(session.initialize(), timeout=self._timeout)
-
-        logger.info(f"Session initialized successfully for '{self.server_name}'")
-        self._session = session
-
-        logger.debug(f"Listing tools for '{self.server_name}'...")
+        logger.debug("Listing tools for '%s'...", self.server_name)
         tools_result = await asyncio.wait_for(
             session.list_tools(), timeout=self._timeout
         )
-        for tool in tools_result.tools:
-            logger.debug(f"Found tool in '{self.server_name}': {tool.name}")
-            logger.debug(f"  Description: {tool.description}")
-            logger.debug(f"  Parameters: {tool.inputSchema}")
-        logger.info(f"Successfully initialized MCP server '{self.server_name}'")
+        if logger.isEnabledFor(logging.DEBUG):
+            for tool in tools_result.tools:
+                logger.debug("Found tool in '%s': %s", self.server_name, tool.name)
+                logger.debug("  Description: %s", tool.description)
+                logger.debug("  Parameters: %s", tool.inputSchema)
+        logger.info("Successfully initialized MCP server '%s'", self.server_name)
+
+    async def _run(
+        self, server_params: StdioServerParameters, ready: asyncio.Future
+    ) -> None:
+        """Hold the connection open until cleanup() signals the handler to stop"""
+        try:
+            async with AsyncExitStack() as stack:
+                async with asyncio.timeout(self._timeout):
+                    logger.debug("Creating stdio client for '%s'...", self.server_name)
+                    read_stream, write_stream = await stack.enter_async_context(
+                        stdio_client(server_params)
+                    )
+
+                    logger.debug(
+                        "Connected to stdio client for '%s', creating session...",
+                        self.server_name,
+                    )
+                    session = ClientSession(read_stream, write_stream)
+                    await stack.enter_async_context(session)
+
+                    logger.debug("Initializing session for '%s'...", self.server_name)
+                    await session.initialize()
+
+                logger.info(
+                    "Session initialized successfully for '%s'", self.server_name
+                )
+                self._session = session
+                if not ready.done():
+                    ready.set_result(session)
+
+                await self._stop_event.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.error(
+                    f"MCP connection for server '{self.server_name}' failed: {e}",
+                    exc_info=True,
+                )
+        finally:
+            self._session = None
+            if not ready.done():
+                ready.cancel()
+
+    async def _stop_runner(self) -> None:
+        if self._runner is None:
+            return
+        if self._stop_event is not None:
+            self._stop_event.set()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._runner), timeout=self._timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Timeout closing MCP connection for '{self.server_name}'")
+            self._runner.cancel()
+        except Exception as e:
+            logger.error(
+                f"Error closing MCP connection for '{self.server_name}': {e}",
+                exc_info=True,
+            )
+        finally:
+            self._runner = None
 
     async def call_tool(
         self, tool_name: str, arguments: dict, context: ToolCallContext
@@ -133,7 +196,10 @@ class MCPToolHandler(ToolHandler):
             raise ValueError(f"MCP session for server '{self.server_name}' not found")
 
         logger.debug(
-            f"Calling MCP tool '{self.server_name}__{tool_name}' with arguments: {arguments}"
+            "Calling MCP tool '%s__%s' with arguments: %s",
+            self.server_name,
+            tool_name,
+            arguments,
         )
         raw_result = await asyncio.wait_for(
             self._session.call_tool(tool_name, arguments), timeout=self._timeout
@@ -142,7 +208,10 @@ class MCPToolHandler(ToolHandler):
         # Extract usable content from MCP result
         extracted_result = _extract_mcp_result(raw_result)
         logger.debug(
-            f"MCP tool '{self.server_name}__{tool_name}' returned: {type(extracted_result).__name__}"
+            "MCP tool '%s__%s' returned: %s",
+            self.server_name,
+            tool_name,
+            type(extracted_result).__name__,
         )
 
         return extracted_result
@@ -153,16 +222,19 @@ class MCPToolHandler(ToolHandler):
             logger.error(f"MCP session for server '{self.server_name}' not found")
             raise ValueError(f"MCP session for server '{self.server_name}' not found")
 
-        logger.debug(f"Listing tools for MCP server '{self.server_name}'")
+        logger.debug("Listing tools for MCP server '%s'", self.server_name)
         tools_result = await asyncio.wait_for(
             self._session.list_tools(), timeout=self._timeout
         )
         logger.debug(
-            f"Found {len(tools_result.tools)} tools for MCP server '{self.server_name}'"
+            "Found %d tools for MCP server '%s'",
+            len(tools_result.tools),
+            self.server_name,
         )
         return tools_result.tools
 
     async def cleanup(self):
-        """Clean up MCP session"""
+        """Close the MCP session and stop the server process"""
+        await self._stop_runner()
         self._session = None
-        logger.info(f"MCPToolHandler for server '{self.server_name}' cleaned up")
+        logger.info("MCPToolHandler for server '%s' cleaned up", self.server_name)
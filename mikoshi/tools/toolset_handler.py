@@ -1,3 +1,4 @@
+import asyncio
 import inspect
 import logging
 from abc import ABC
@@ -61,7 +62,7 @@ class ToolSetHandler(ABC):
             )
             self._tools[tool_def.name] = bound_tool_def
             logger.info(
-                f"Registered tool '{tool_def.name}' in toolset '{self.server_name}'"
+                "Registered tool '%s' in toolset '%s'", tool_def.name, self.server_name
             )
 
     async def call_tool(
@@ -74,7 +75,10 @@ class ToolSetHandler(ABC):
             )
 
         logger.debug(
-            f"[{self.server_name}] Calling tool '{tool_name}' with arguments: {arguments}"
+            "[%s] Calling tool '%s' with arguments: %s",
+            self.server_name,
+            tool_name,
+            arguments,
         )
 
         kwargs = dict(arguments)
@@ -85,10 +89,16 @@ class ToolSetHandler(ABC):
         if inspect.iscoroutinefunction(tool_def.func):
             result = await tool_def.func(**kwargs)
         else:
-            result = tool_def.func(**kwargs)
+            # Plain tools do blocking file and subprocess work (e.g. reading
+            # workspace files, git push); run them off the event loop
+            result = await asyncio.to_thread(tool_def.func, **kwargs)
 
         logger.debug(
-            f"[{self.server_name}] Tool '{tool_name}' returned: type={type(result)}, value={result}"
+            "[%s] Tool '%s' returned: type=%s, value=%s",
+            self.server_name,
+            tool_name,
+            type(result),
+            result,
         )
         return result
 
@@ -104,7 +114,7 @@ class ToolSetHandler(ABC):
         if not self._tool_manager:
             raise RuntimeError("ToolManager not set")
 
-        logger.debug(f"[{self.server_name}] Calling {call_name}")
+        logger.debug("[%s] Calling %s", self.server_name, call_name)
 
         result = await self._tool_manager.call_tool(call_name, arguments, context)
         return result
@@ -1,66 +1,132 @@
 import logging
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from typing import Dict, Final
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import FileResponse
 
 logger = logging.getLogger(__name__)
 
+CONTENT_TYPES: Final[Dict[str, str]] = {
+    ".html": "text/html",
+    ".css": "text/css",
+    ".js": "application/javascript",
+    ".json": "application/json",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".svg": "image/svg+xml",
+    ".ico": "image/x-icon",
+    ".woff": "font/woff",
+    ".woff2": "font/woff2",
+    ".ttf": "font/ttf",
+    ".eot": "application/vnd.ms-fontobject",
+}
 
-def _get_content_type(file_path: Path) -> str:
+_ENCODING_RE = re.compile(r"\b(br|gzip)\b")
+
+# Files smaller than this are served as-is; compression wouldn't pay for itself
+MIN_COMPRESS_SIZE = 1024
+
+# Vite emits content-hashed bundles like assets/index-BkX2a9cD.js, which never change
+_HASHED_ASSET_RE = re.compile(r"^assets/.+-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Paths under these are handled by the backend, never by the SPA
+_API_PREFIXES = frozenset({"api", "health"})
+
+
+@dataclass(frozen=True)
+class _StaticAsset:
+    """A servable file and its precompressed siblings, resolved once."""
+
+    path: str
+    br_path: str | None
+    gz_path: str | None
+    content_type: str
+    immutable: bool = False
+
+
+def _get_content_type(file_path: str) -> str:
     """Get MIME type for a file based on its extension"""
-    suffix = file_path.suffix.lower()
-    content_types = {
-        ".html": "text/html",
-        ".css": "text/css",
-        ".js": "application/javascript",
-        ".json": "application/json",
-        ".png": "image/png",
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".gif": "image/gif",
-        ".svg": "image/svg+xml",
-        ".ico": "image/x-icon",
-        ".woff": "font/woff",
-        ".woff2": "font/woff2",
-        ".ttf": "font/ttf",
-        ".eot": "application/vnd.ms-fontobject",
-    }
-    return content_types.get(suffix, "application/octet-stream")
-
-
-def _serve_with_compression(
-    file_path: Path, request: Request, content_type: str | None = None
-) -> FileResponse:
-    """Serve a file with compression support (brotli/gzip)"""
-    logger.debug(f"Attempting to serve file: {file_path}")
-    accept_encoding = request.headers.get("accept-encoding", "")
-    supports_brotli = "br" in accept_encoding.lower()
-    supports_gzip = "gzip" in accept_encoding.lower()
+    suffix = os.path.splitext(file_path)[1].lower()
+    return CONTENT_TYPES.get(suffix, "application/octet-stream")
+
+
+@lru_cache(maxsize=128)
+def _parse_accept_encoding(accept_encoding: str) -> tuple[bool, bool]:
+    """Return (supports_brotli, supports_gzip) for an Accept-Encoding header.
+
+    Browsers send the same few header values, so results are cached per string.
+    """
+    encodings = set(_ENCODING_RE.findall(accept_encoding.lower()))
+    return "br" in encodings, "gzip" in encodings
+
+
+def _build_manifest(root: str) -> Dict[str, _StaticAsset]:
+    """Index every file in the build output along with its compressed variants"""
+    manifest: Dict[str, _StaticAsset] = {}
+    for dirpath, _, filenames in os.walk(root):
+        names = set(filenames)
+        rel_dir = os.path.relpath(dirpath, root)
+        for name in filenames:
+            base, ext = os.path.splitext(name)
+            if ext in (".br", ".gz") and base in names:
+                continue
+
+            file_path = os.path.join(dirpath, name)
+            rel_path = os.path.normpath(os.path.join(rel_dir, name)).replace(
+                os.sep, "/"
+            )
+            compress = os.path.getsize(file_path) >= MIN_COMPRESS_SIZE
+            has_br = compress and name + ".br" in names
+            has_gz = compress and name + ".gz" in names
+            manifest[rel_path] = _StaticAsset(
+                path=file_path,
+                br_path=file_path + ".br" if has_br else None,
+                gz_path=file_path + ".gz" if has_gz else None,
+                content_type=_get_content_type(name),
+                immutable=_HASHED_ASSET_RE.match(rel_path) is not None,
+            )
+    return manifest
+
 
-    if content_type is None:
-        content_type = _get_content_type(file_path)
+def _serve_with_compression(asset: _StaticAsset, request: Request) -> FileResponse:
+    """Serve a file with compression support (brotli/gzip)"""
+    logger.debug("Attempting to serve file: %s", asset.path)
+    headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL} if asset.immutable else {}
+    # Small files have no variants, so there is nothing to negotiate
+    if asset.br_path is None and asset.gz_path is None:
+        return FileResponse(asset.path, media_type=asset.content_type, headers=headers)
+
+    # Every response for this file, compressed or not, depends on the request's
+    # Accept-Encoding, so shared caches must key on it
+    headers["Vary"] = "Accept-Encoding"
+    supports_brotli, supports_gzip = _parse_accept_encoding(
+        request.headers.get("accept-encoding", "")
+    )
 
     # Check for brotli version first (better compression)
-    if supports_brotli:
-        br_path = Path(str(file_path) + ".br")
-        if br_path.exists():
-            return FileResponse(
-                br_path,
-                headers={"Content-Encoding": "br", "Content-Type": content_type},
-            )
+    if supports_brotli and asset.br_path is not None:
+        headers["Content-Encoding"] = "br"
+        return FileResponse(
+            asset.br_path, media_type=asset.content_type, headers=headers
+        )
 
     # Fall back to gzip
-    if supports_gzip:
-        gz_path = Path(str(file_path) + ".gz")
-        if gz_path.exists():
-            return FileResponse(
-                gz_path,
-                headers={"Content-Encoding": "gzip", "Content-Type": content_type},
-            )
+    if supports_gzip and asset.gz_path is not None:
+        headers["Content-Encoding"] = "gzip"
+        return FileResponse(
+            asset.gz_path, media_type=asset.content_type, headers=headers
+        )
 
-    # Serve uncompressed
-    return FileResponse(file_path)
+    # Serve uncompressed; passing the type skips FileResponse's mimetypes lookup
+    return FileResponse(asset.path, media_type=asset.content_type, headers=headers)
 
 
 def _find_webui_dist() -> Path | None:
@@ -85,19 +151,36 @@ def setup_webui(app: FastAPI):
         )
         return
 
+    # The build output doesn't change while the server runs, so it is indexed
+    # once and requests are answered without touching the filesystem
+    webui_dist_str = os.path.realpath(webui_dist)
+    assets = _build_manifest(webui_dist_str)
+    index_asset = assets.get("index.html") or _StaticAsset(
+        path=os.path.join(webui_dist_str, "index.html"),
+        br_path=None,
+        gz_path=None,
+        content_type="text/html",
+    )
+    logger.info("Indexed %d web UI file(s) from %s", len(assets), webui_dist_str)
+
     @app.get("/{full_path:path}")
     async def serve_static(full_path: str, request: Request):
         """Serve static files with compression support"""
         if not full_path:
-            index_path = webui_dist / "index.html"
-            return _serve_with_compression(index_path, request, "text/html")
+            return _serve_with_compression(index_asset, request)
+
+        # Unmatched backend routes and traversal attempts get a plain 404
+        # instead of falling through to the SPA's index.html
+        segments = full_path.split("/")
+        if segments[0] in _API_PREFIXES or ".." in segments:
+            raise HTTPException(status_code=404, detail="Not found")
 
-        file_path = webui_dist / full_path
-        if file_path.exists() and file_path.is_file():
-            return _serve_with_compression(file_path, request)
+        # Only files in the manifest are served, so paths can't escape the build dir
+        asset = assets.get(full_path)
+        if asset is not None:
+            return _serve_with_compression(asset, request)
 
         if "." not in full_path:
-            index_path = webui_dist / "index.html"
-            return _serve_with_compression(index_path, request, "text/html")
+            return _serve_with_compression(index_asset, request)
 
         raise HTTPException(status_code=404, detail="File not found")